@@ -0,0 +1,106 @@
+"""
+End-to-end response time of the large API responses, per serialization path.
+
+- /api/people (response_model): the app as shipped, where FastAPI dumps the
+  models straight through pydantic-core, vs the same route on an app whose
+  default_response_class is CodecJSONResponse (jsonable_encoder, then codec).
+- /api/schedule (plain dict payload): returned as a CodecJSONResponse, as
+  shipped, vs returned as a dict for FastAPI's jsonable_encoder + JSONResponse.
+  The scheduler is replaced by a stub so only the endpoint and its response
+  are timed.
+
+Usage (from backend/):
+    python -m benchmarks.api_responses [--people 100000] [--schedule-people 20000] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+
+import src.main as api
+from src.database.storage import JSONStorage
+from benchmarks.data import build_people
+
+HOLIDAYS = [
+    {"date": f"2025-{month:02d}-01", "name": f"Holiday {month}", "display_date": f"{month:02d} 01, 2025",
+     "month": month, "day": 1}
+    for month in range(1, 13)
+]
+
+
+class StubScheduler:
+    """Answers get_email_schedules with a fixed schedule for every location."""
+
+    def get_email_schedules(self, locations, **kwargs):
+        return [
+            {
+                "scheduled_dates": ["2025-01-02 09:00 AM", "2025-01-06 09:00 AM", "2025-01-09 09:00 AM"],
+                "holidays": HOLIDAYS,
+                "location": {"city": city, "state": state, "country": country, "timezone": "Asia/Kolkata"},
+            }
+            for city, state, country in locations
+        ]
+
+
+def codec_default_app() -> FastAPI:
+    """The /api/people route on an app with CodecJSONResponse as its default response class."""
+    app = FastAPI(default_response_class=api.CodecJSONResponse)
+    route = next(route for route in api.app.routes if getattr(route, "path", None) == "/api/people")
+    app.add_api_route(route.path, route.endpoint, methods=list(route.methods), response_model=route.response_model)
+    return app
+
+
+async def best_of(repeat: int, app: FastAPI, method: str, url: str, **kwargs) -> float:
+    """Best wall-clock time of one request over repeat runs, in milliseconds."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return min(timings)
+
+
+async def run(people: int, schedule_people: int, repeat: int):
+    storage = JSONStorage(tempfile.mkdtemp(prefix="mountain-bench-"))
+    storage._write_json(storage.people_file, build_people(people))
+    await storage.reload()
+    api.storage = storage
+
+    shipped_ms = await best_of(repeat, api.app, "GET", "/api/people")
+    codec_default_ms = await best_of(repeat, codec_default_app(), "GET", "/api/people")
+    print(f"GET /api/people, {people:,} people (best of {repeat})")
+    print(f"  response_model via pydantic-core (shipped): {shipped_ms:8.1f}ms")
+    print(f"  codec as default_response_class:            {codec_default_ms:8.1f}ms")
+
+    api._scheduler_service = StubScheduler()
+    body = {"people": [
+        {"person_id": str(i), "name": f"Person {i}", "city": f"City {i % 50}", "country": "India"}
+        for i in range(schedule_people)
+    ]}
+    codec_ms = await best_of(repeat, api.app, "POST", "/api/schedule", json=body)
+    codec_response = api.CodecJSONResponse
+    # Hand the payload back as a plain dict, as the endpoint did before
+    api.CodecJSONResponse = lambda content: content
+    try:
+        encoder_ms = await best_of(repeat, api.app, "POST", "/api/schedule", json=body)
+    finally:
+        api.CodecJSONResponse = codec_response
+    print(f"POST /api/schedule, {schedule_people:,} people (best of {repeat})")
+    print(f"  CodecJSONResponse returned directly (shipped): {codec_ms:8.1f}ms")
+    print(f"  dict via jsonable_encoder + JSONResponse:      {encoder_ms:8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--people", type=int, default=100_000)
+    parser.add_argument("--schedule-people", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.people, args.schedule_people, args.repeat))
@@ -0,0 +1,51 @@
+"""
+Serialization benchmark for the JSON codecs on a large people table.
+
+Times dumps (compact and pretty, as used by the journal and the snapshot
+files) and loads for every available codec.
+
+Usage (from backend/):
+    python -m benchmarks.codec_benchmark [--people 100000] [--repeat 3]
+"""
+
+import argparse
+import time
+
+from src.codec import CODECS, get_codec
+from benchmarks.data import build_people
+
+
+def best_of(repeat: int, func, *args) -> float:
+    """Best wall-clock time of func(*args) over repeat runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def run(people: int, repeat: int):
+    records = build_people(people)
+    print(f"people: {people:,}  (best of {repeat})")
+    print(f"{'codec':<8} {'dumps':>10} {'dumps pretty':>14} {'loads':>10} {'size':>10}")
+
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except RuntimeError:
+            print(f"{name:<8} not installed")
+            continue
+        payload = codec.dumps(records)
+        dumps_ms = best_of(repeat, codec.dumps, records)
+        pretty_ms = best_of(repeat, lambda: codec.dumps(records, pretty=True))
+        loads_ms = best_of(repeat, codec.loads, payload)
+        print(f"{name:<8} {dumps_ms:>8.1f}ms {pretty_ms:>12.1f}ms {loads_ms:>8.1f}ms {len(payload) / 1e6:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--people", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.people, args.repeat)
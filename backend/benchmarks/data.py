@@ -0,0 +1,29 @@
+"""Synthetic data sets shared by the benchmarks."""
+
+from uuid import uuid4
+
+
+def build_people(count: int) -> list:
+    """Generate synthetic people records spread over a few hundred companies."""
+    return [
+        {
+            "id": str(uuid4()),
+            "companyId": f"company-{i % 500}",
+            "name": f"Person {i}",
+            "email": f"person{i}@example.com",
+            "position": "Engineer",
+            "linkedin": None,
+            "city": "Bangalore",
+            "country": "India",
+            "attempts": 0,
+            "lastEmailDate": None,
+            "opened": False,
+            "openCount": 0,
+            "clicked": False,
+            "clickCount": 0,
+            "resumeOpened": False,
+            "resumeOpenCount": 0,
+            "responded": False,
+        }
+        for i in range(count)
+    ]
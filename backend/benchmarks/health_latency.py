@@ -0,0 +1,93 @@
+"""
+/health latency while JSONStorage writes a large data set.
+
+Builds a throwaway data directory with a large people table, then measures
+/health response times on their own and while the storage is compacting.
+Every record is marked dirty before each compaction, so each round really
+serializes and rewrites every table (an unchanged store would skip them).
+Copying, serialization and file I/O all run off the event loop, so /health
+never waits for a whole write; it only shares the GIL with the I/O thread,
+which costs a request a couple of 5ms switch intervals at worst.
+
+Usage (from backend/):
+    python -m benchmarks.health_latency [--people 200000] [--requests 500]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import httpx
+
+import src.main as api
+from src.database.storage import JSONStorage
+from benchmarks.data import build_people
+
+
+async def measure_health(client: httpx.AsyncClient, requests: int) -> list:
+    """Hit /health sequentially and return per-request latencies in milliseconds."""
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        # Yield so a concurrent writer gets scheduled; any time it then spends on
+        # the loop counts against this request
+        await asyncio.sleep(0)
+        response = await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+def all_shards(storage: JSONStorage) -> set:
+    """Every snapshot file/shard holding records."""
+    return {storage._shard_of(name, record) for name, table in storage._tables().items() for record in table.values()}
+
+
+def p99(values: list) -> float:
+    return statistics.quantiles(values, n=100)[98]
+
+
+async def run(people: int, requests: int):
+    data_dir = tempfile.mkdtemp(prefix="mountain-bench-")
+    storage = JSONStorage(data_dir)
+    storage._write_json(storage.people_file, build_people(people))
+    await storage.reload()
+    api.storage = storage
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        idle = await measure_health(client, requests)
+
+        writing = True
+
+        # The records don't change, so neither do their shards
+        shards = all_shards(storage)
+
+        async def writer():
+            rounds = 0
+            while writing:
+                # Mark them all changed, so the compaction rewrites every one
+                storage._dirty.update(shards)
+                await storage.compact()
+                rounds += 1
+            return rounds
+
+        writer_task = asyncio.create_task(writer())
+        busy = await measure_health(client, requests)
+        writing = False
+        rounds = await writer_task
+
+    print(f"people: {people:,}  requests: {requests}  full rewrites during run: {rounds}")
+    for label, latencies in (("idle", idle), ("write", busy)):
+        print(f"{label:<6} p50={statistics.median(latencies):.2f}ms  p99={p99(latencies):.2f}ms  "
+              f"max={max(latencies):.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--people", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.people, args.requests))
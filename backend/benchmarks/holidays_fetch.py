@@ -0,0 +1,82 @@
+"""
+Wall-clock time of Holidays.fetch_holiday_data, serial vs concurrent.
+
+Starts a local stub of the holidays API that answers every request after a
+fixed latency, then fetches every country twice: once paced like the old
+serial loop (one worker, one request per sleep_time) and once with the
+concurrent fetcher. Both runs must return the same rows.
+
+Usage (from backend/):
+    python -m benchmarks.holidays_fetch [--latency 0.05] [--workers 16] [--rate 50]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.holidays import Holidays
+
+
+def make_handler(latency: float):
+    class StubHolidaysHandler(BaseHTTPRequestHandler):
+        """Answers /v1/holidays?country=XX&year=YYYY with two fake holidays."""
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            country = query.get("country", ["XX"])[0]
+            year = query.get("year", ["2025"])[0]
+            time.sleep(latency)
+            body = json.dumps([
+                {"name": f"{country} Day", "date": f"{year}-03-01", "type": "Public Holiday"},
+                {"name": f"{country} Bank Day", "date": f"{year}-08-01", "type": "Bank Holiday"},
+            ]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHolidaysHandler
+
+
+def timed_fetch(holidays: Holidays, **kwargs):
+    start = time.perf_counter()
+    df = holidays.fetch_holiday_data(2025, countries="all", **kwargs)
+    return time.perf_counter() - start, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub response latency in seconds")
+    parser.add_argument("--sleep", type=float, default=0.1, help="legacy sleep_time for the serial run")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent workers")
+    parser.add_argument("--rate", type=float, default=50, help="requests per second for the concurrent run")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Caching disabled so both runs hit the stub
+    holidays = Holidays(base_url=f"http://127.0.0.1:{server.server_port}/v1/holidays", cache_ttl=0)
+
+    try:
+        serial_time, serial_df = timed_fetch(holidays, sleep_time=args.sleep, max_workers=1)
+        concurrent_time, concurrent_df = timed_fetch(holidays, max_workers=args.workers, rate_limit=args.rate)
+    finally:
+        server.shutdown()
+
+    assert serial_df.equals(concurrent_df), "serial and concurrent fetches returned different rows"
+
+    print(f"countries: {serial_df['country'].nunique()}, rows: {len(serial_df)}")
+    print(f"serial (1 worker, sleep {args.sleep}s):        {serial_time:7.2f}s")
+    print(f"concurrent ({args.workers} workers, {args.rate:g} req/s): {concurrent_time:7.2f}s")
+    print(f"speedup: {serial_time / concurrent_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
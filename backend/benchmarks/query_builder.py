@@ -0,0 +1,66 @@
+"""
+Time to build hot queries with the SQL-text cache warm vs cleared before every build.
+
+Builds the same query shapes the holidays table reader and the keyset
+paginator use, with fresh parameter values on each iteration, and checks
+that cached and freshly generated SQL are identical. No database is needed:
+only SQL generation is timed.
+
+Usage (from backend/):
+    python -m benchmarks.query_builder [--iterations 20000]
+"""
+
+import argparse
+import time
+from datetime import date
+
+from src.database.xata import DatabaseManager
+from src.database.xata.database import sql_cache
+
+
+def build_queries(db: DatabaseManager, i: int) -> list:
+    return [
+        db.select("country", "name", "date", "holiday_type")
+            .from_("holidays")
+            .where("country").in_(["IN", "JP", "US"][:i % 3 + 1])
+            .and_where("date").between(date(2025, 1, 1), date(2025, 12, 31))
+            .order_by("country").order_by("date").order_by("id")
+            ._build(),
+        db.select().from_("people").keyset("id", f"person-{i}", 101)._build(),
+        db.update("people").set({"status": "sent", "updated_at": i}).where("id").equals(f"person-{i}")._build(),
+        db.insert.into("email_stats").values({"company_id": i, "opens": 1, "clicks": 0})._build(),
+    ]
+
+
+def timed(db: DatabaseManager, iterations: int, clear: bool):
+    sqls = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        if clear:
+            sql_cache.clear()
+        sqls.append([query.sql for query in build_queries(db, i)])
+    return time.perf_counter() - start, sqls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000, help="rounds of 4 queries to build")
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    cold_time, cold_sqls = timed(db, args.iterations, clear=True)
+    sql_cache.clear()
+    warm_time, warm_sqls = timed(db, args.iterations, clear=False)
+
+    assert cold_sqls == warm_sqls, "cached SQL differs from freshly built SQL"
+    distinct = {sql for round_sqls in warm_sqls for sql in round_sqls}
+
+    queries = args.iterations * 4
+    print(f"{queries} queries, {len(distinct)} distinct SQL texts (cache hits {sql_cache.hits}, misses {sql_cache.misses})")
+    print(f"build, cache cleared: {cold_time / queries * 1e6:6.2f}us per query")
+    print(f"build, cache warm:    {warm_time / queries * 1e6:6.2f}us per query")
+    print(f"speedup: {cold_time / warm_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
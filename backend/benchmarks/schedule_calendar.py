@@ -0,0 +1,97 @@
+"""
+Send-date computation: the old day-by-day loop vs the business-day calendar.
+
+Draws random start dates (and holiday sets), checks that schedule_business_days
+returns the same three dates as the loop Scheduler.get_email_schedule used to
+run, then times both over the same start dates.
+
+Usage (from backend/):
+    python -m benchmarks.schedule_calendar [--people 10000] [--holidays 15] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from src.scheduler import BUSINESS_WEEKMASK, schedule_business_days, schedule_hops
+
+SCHEDULE_CHAIN = {
+    'Monday': 'Thursday',
+    'Tuesday': 'Friday',
+    'Wednesday': 'Monday',
+    'Thursday': 'Monday',
+    'Friday': 'Tuesday',
+}
+
+
+def loop_schedule(start_date: date, holiday_dates: set, count: int = 3) -> list:
+    """The original walk: one day at a time, hopping by weekday name after each send date."""
+    current = start_date
+    scheduled = []
+    while len(scheduled) < count:
+        if current.weekday() < 5 and current not in holiday_dates:
+            scheduled.append(current)
+            target = SCHEDULE_CHAIN[current.strftime("%A")]
+            current += timedelta(days=1)
+            while current.strftime("%A") != target:
+                current += timedelta(days=1)
+        else:
+            current += timedelta(days=1)
+    return scheduled
+
+
+def random_holidays(rng: random.Random, year: int, count: int) -> set:
+    return {date(year, 1, 1) + timedelta(days=rng.randrange(365)) for _ in range(count)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--people", type=int, default=10000, help="start dates to schedule")
+    parser.add_argument("--holidays", type=int, default=15, help="random holidays in the calendar")
+    parser.add_argument("--checks", type=int, default=200, help="random calendars to compare on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    hops = schedule_hops(SCHEDULE_CHAIN)
+
+    def calendar_for(holiday_dates):
+        return np.busdaycalendar(weekmask=BUSINESS_WEEKMASK,
+                                 holidays=np.array(sorted(holiday_dates), dtype="datetime64[D]"))
+
+    # Equivalence on many calendars, including clusters of consecutive holidays
+    for _ in range(args.checks):
+        holiday_dates = random_holidays(rng, 2025, args.holidays)
+        first = date(2025, 1, 1) + timedelta(days=rng.randrange(350))
+        holiday_dates.update(first + timedelta(days=offset) for offset in range(rng.randrange(6)))
+        starts = [date(2025, 1, 1) + timedelta(days=rng.randrange(350)) for _ in range(50)]
+        vectorized = schedule_business_days(np.array(starts, dtype="datetime64[D]"),
+                                            calendar_for(holiday_dates), hops).tolist()
+        for start, dates in zip(starts, vectorized):
+            expected = loop_schedule(start, holiday_dates)
+            assert dates == expected, f"start {start}: {dates} != {expected}"
+
+    holiday_dates = random_holidays(rng, 2025, args.holidays)
+    starts = [date(2025, 1, 1) + timedelta(days=rng.randrange(350)) for _ in range(args.people)]
+
+    start = time.perf_counter()
+    for start_date in starts:
+        loop_schedule(start_date, holiday_dates)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    schedule_business_days(np.array(starts, dtype="datetime64[D]"), calendar_for(holiday_dates), hops)
+    vectorized_time = time.perf_counter() - start
+
+    print(f"checked {args.checks} random calendars: identical send dates")
+    print(f"{args.people} start dates, {len(holiday_dates)} holidays")
+    print(f"day-by-day loop:       {loop_time * 1000:8.1f}ms")
+    print(f"business-day calendar: {vectorized_time * 1000:8.1f}ms")
+    print(f"speedup: {loop_time / vectorized_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Cold-start import time of the API module.
+
+Imports src.main in fresh interpreters under `python -X importtime` and
+reports the median total import time, plus the slowest direct imports of
+src.main. Pass --warm-up to also time warm_up_services(), i.e. what the
+first /api/schedule request (or WARMUP_SERVICES=true) pays on top.
+
+Usage (from backend/):
+    python -m benchmarks.startup_benchmark [--runs 5] [--top 10] [--warm-up]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+WARM_UP_SNIPPET = (
+    "import time; import src.main as m; start = time.perf_counter(); "
+    "m.warm_up_services(); print(time.perf_counter() - start)"
+)
+
+
+def parse_importtime(stderr: str) -> list:
+    """Parse -X importtime output into (self_us, cumulative_us, depth, module) tuples."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return entries
+
+
+def import_once(backend_dir: str) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=backend_dir, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to measure")
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports of src.main to list")
+    parser.add_argument("--warm-up", action="store_true", help="also time warm_up_services()")
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    totals = []
+    children = {}
+    for _ in range(args.runs):
+        entries = import_once(backend_dir)
+        main_entry = next(entry for entry in entries if entry[3] == "src.main")
+        totals.append(main_entry[1])
+        # importtime lists children before their parent, so the modules imported
+        # directly by src.main are the depth-1 entries
+        for _, cumulative_us, depth, name in entries:
+            if depth == main_entry[2] + 1:
+                children.setdefault(name, []).append(cumulative_us)
+
+    print(f"import src.main: median {statistics.median(totals) / 1000:.0f}ms over {args.runs} runs")
+    print(f"\nslowest direct imports (median cumulative):")
+    slowest = sorted(children.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in slowest[:args.top]:
+        print(f"  {statistics.median(values) / 1000:8.1f}ms  {name}")
+
+    if args.warm_up:
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", WARM_UP_SNIPPET],
+            cwd=backend_dir, capture_output=True, text=True, check=True
+        )
+        print(f"\nwarm_up_services(): {float(result.stdout.strip().splitlines()[-1]) * 1000:.0f}ms "
+              f"(whole process {(time.perf_counter() - start) * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
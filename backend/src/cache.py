@@ -0,0 +1,199 @@
+"""
+Two-tier key/value cache: an in-process LRU in front of a SQLite file.
+
+Entries expire after a TTL. Keys are strings and values anything the
+shared JSON codec can encode (None included, so misses can be cached too).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+from .codec import codec
+
+# Returned by get() when a key is absent or expired
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: Maximum number of entries; the least recently used is evicted first.
+            ttl: Default time-to-live in seconds (None: entries never expire).
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        """Get a live entry, marking it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None):
+        """Store an entry expiring after ttl seconds (or at the absolute expires_at time)."""
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """
+    Persistent key/value cache stored in a SQLite file.
+    Safe to share between threads and between processes using the same file.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: Optional[float] = None, table: str = "cache"):
+        """
+        Args:
+            path: SQLite database file (created on first use, along with its directory).
+            ttl: Default time-to-live in seconds (None: entries never expire).
+            table: Table holding the entries, so several caches can share one file.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.table = table
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use. Must be called with the lock held."""
+        if self._conn is None:
+            os.makedirs(self.path.parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            # WAL lets readers in other processes proceed while one process writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """Get (value, expires_at) for a live entry, or None."""
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return codec.loads(value), expires_at
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        """Get a live entry's value."""
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None):
+        """Store an entry expiring after ttl seconds (or at the absolute expires_at time)."""
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = time.time() + ttl if ttl is not None else None
+        data = codec.dumps(value)
+        with self._lock:
+            self._connection().execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, expires_at)
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._connection().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._connection().execute(f"DELETE FROM {self.table}")
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        with self._lock:
+            cursor = self._connection().execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TieredCache:
+    """
+    In-process LRU in front of a SQLite file.
+    Reads check memory first and promote disk hits; writes go to both tiers
+    with the same absolute expiry.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: Optional[float] = None,
+                 maxsize: int = 1024, table: str = "cache"):
+        """
+        Args:
+            path: SQLite database file for the persistent tier.
+            ttl: Default time-to-live in seconds (None: entries never expire).
+            maxsize: Maximum number of entries kept in memory.
+            table: SQLite table holding the entries.
+        """
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteCache(path, ttl=ttl, table=table)
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        self.memory.set(key, value, expires_at=expires_at)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        self.disk.set(key, value, expires_at=expires_at)
+        self.memory.set(key, value, expires_at=expires_at)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
@@ -0,0 +1,78 @@
+"""
+JSON codec layer shared by JSONStorage persistence and the API responses.
+
+Uses orjson when it is installed and falls back to the stdlib json module.
+Set JSON_CODEC=json (or orjson) to force a particular backend.
+"""
+
+import json
+import os
+from typing import Any, Dict, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StdlibJSONCodec:
+    """Codec backed by the standard library json module."""
+    
+    name = "json"
+    
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes (indented by two spaces when pretty)."""
+        if pretty:
+            text = json.dumps(obj, indent=2, ensure_ascii=False)
+        else:
+            text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+        return text.encode('utf-8')
+    
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Parse JSON from bytes or str."""
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """Codec backed by orjson (several times faster for large payloads)."""
+    
+    name = "orjson"
+    
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("orjson is not installed")
+    
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes (indented by two spaces when pretty)."""
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(obj, option=option)
+    
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Parse JSON from bytes or str."""
+        return orjson.loads(data)
+
+
+CODECS: Dict[str, type] = {
+    StdlibJSONCodec.name: StdlibJSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+}
+
+
+def get_codec(name: str = None):
+    """
+    Get a codec instance by name.
+    
+    Args:
+        name: 'json' or 'orjson'. Defaults to the JSON_CODEC environment variable,
+            then to the fastest installed backend.
+    """
+    name = name or os.getenv("JSON_CODEC")
+    if name is None:
+        name = OrjsonCodec.name if orjson is not None else StdlibJSONCodec.name
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON codec: {name}. Available: {', '.join(CODECS)}")
+    return CODECS[name]()
+
+
+# Process-wide default codec
+codec = get_codec()
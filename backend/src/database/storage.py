@@ -1,9 +1,21 @@
 import json
 import os
-from typing import List, Optional, Dict, Any
+import re
+import zlib
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import List, Optional, Dict, Any, Tuple, Set
 from uuid import uuid4
 from pathlib import Path
 
+try:
+    import fcntl  # POSIX only; needed for cross-process locking
+except ImportError:
+    fcntl = None
+
+from ..codec import codec
 from ..models import (
     Company, CompanyCreate, CompanyUpdate,
     Person, PersonCreate,
@@ -11,10 +23,57 @@ from ..models import (
 )
 
 
+# Counters maintained per company; the has* flags are derived from the *People counts
+COMPANY_COUNTER_KEYS = (
+    'totalPeople', 'totalEmails',
+    'openedPeople', 'openCount',
+    'clickedPeople', 'clickCount',
+    'resumeOpenCount', 'respondedPeople',
+)
+# Dashboard totals maintained across all existing companies
+SUMMARY_KEYS = ('totalEmails', 'totalOpens', 'totalClicks', 'totalResponses')
+
+# (table name, shard name) pair; the shard is None for tables kept in a single file
+ShardKey = Tuple[str, Optional[str]]
+# (write generation, journal inode, journal size); inode and size are None without a journal
+JournalSignature = Tuple[int, Optional[int], Optional[int]]
+
+_MONTH_PREFIX = re.compile(r'^\d{4}-\d{2}')
+
+# Records serialized per codec call when writing a table file. The I/O thread holds
+# the GIL for the whole of one call, so the event loop gets a turn between chunks.
+WRITE_CHUNK_RECORDS = 1000
+
+
 class JSONStorage:
     """JSON file-based storage implementation matching the original TypeScript interface."""
     
-    def __init__(self, data_dir: str = None):
+    def __init__(self, data_dir: str = None, in_memory: bool = True, compact_threshold: int = 500,
+                 process_lock: bool = False, json_codec=None, sharded: bool = False,
+                 people_buckets: int = 16):
+        """
+        Args:
+            data_dir: Directory holding the JSON data files.
+            in_memory: Keep companies, people and email stats loaded in memory
+                (keyed by id) and serve reads from there. When False, the files
+                are re-read before every operation.
+            compact_threshold: Number of journal entries after which the journal
+                is folded back into the JSON snapshot files.
+            process_lock: Take a file lock on the data directory around every
+                operation (shared for reads, exclusive for writes) and reload when
+                another process has written, so several workers can share one
+                data directory.
+            json_codec: Codec used for the data files and journal; defaults to the
+                process-wide codec (orjson when installed).
+            sharded: Split the people and email stats snapshots into shard files
+                (people/bucket-NN.json by companyId hash, email_stats/YYYY-MM.json
+                by sentDate month), so compaction only rewrites changed shards.
+                Existing single-file snapshots are migrated on first load.
+            people_buckets: Number of companyId hash buckets for sharded people.
+        """
+        if process_lock and fcntl is None:
+            raise RuntimeError("process_lock requires fcntl, which is not available on this platform")
+
         if data_dir is None:
             data_dir = os.path.join(os.path.dirname(__file__), "data")
         
@@ -23,6 +82,44 @@ class JSONStorage:
         self.people_file = self.data_dir / "people.json"
         self.email_stats_file = self.data_dir / "email_stats.json"
         self.profile_file = self.data_dir / "profile.json"
+        self.journal_file = self.data_dir / "journal.jsonl"
+        self.lock_file = self.data_dir / ".storage.lock"
+        self.in_memory = in_memory
+        self.compact_threshold = compact_threshold
+        self.process_lock = process_lock
+        self.codec = json_codec or codec
+        self.sharded = sharded
+        self.people_buckets = people_buckets
+        
+        # In-memory tables keyed by record id
+        self._companies: Dict[str, Dict[str, Any]] = {}
+        self._people: Dict[str, Dict[str, Any]] = {}
+        self._email_stats: Dict[str, Dict[str, Any]] = {}
+        # Per-company aggregate counters, updated as people/email stats change
+        self._company_counters: Dict[str, Dict[str, int]] = {}
+        # Dashboard totals over existing companies, kept in step with the counters above
+        self._summary_totals: Dict[str, int] = dict.fromkeys(SUMMARY_KEYS, 0)
+        # Secondary indexes: foreign key -> {record id: record}
+        self._people_by_company: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._email_stats_by_person: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._email_stats_by_company: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # Record ids of each table in sorted order, for keyset pagination
+        self._sorted_ids: Dict[str, List[str]] = {}
+        # Mutations appended to the journal since the last compaction
+        self._journal_entries = 0
+        # Snapshot files/shards holding records changed since the last compaction
+        self._dirty: Set[ShardKey] = set()
+        # Journal signature (see _journal_signature) as of our last read or write
+        self._journal_signature_seen: Optional[JournalSignature] = None
+        self._loaded = False
+        # Single worker: file I/O is kept off the event loop and runs in order
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="json-storage-io")
+        
+        # Per-table locks serialize read-modify-write cycles within this process
+        self._table_locks = {name: asyncio.Lock() for name in ("companies", "people", "email_stats")}
+        # The data directory lock is shared by the whole process, so hand it out one holder at a time
+        self._process_mutex = asyncio.Lock()
+        self._lock_fd = None
         
         # Ensure data directory exists
         self.data_dir.mkdir(parents=True, exist_ok=True)
@@ -38,17 +135,364 @@ class JSONStorage:
                 self._write_json(file_path, [])
     
     def _read_json(self, file_path: Path) -> List[Dict[str, Any]]:
-        """Read and parse JSON file."""
+        """Read and parse JSON file.
+        
+        A missing file reads as empty. A file that does not parse raises instead of
+        reading as empty, so it can never be compacted over with an empty table.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
+            with open(file_path, 'rb') as f:
+                return self.codec.loads(f.read())
+        except FileNotFoundError:
             return []
     
-    def _write_json(self, file_path: Path, data: List[Dict[str, Any]]):
-        """Write data to JSON file."""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    def _write_json(self, file_path: Path, data: Any):
+        """Atomically write data to JSON file (temp file, fsync, then os.replace)."""
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                if isinstance(data, list) and len(data) > WRITE_CHUNK_RECORDS:
+                    self._write_json_chunks(f, data)
+                else:
+                    f.write(self.codec.dumps(data, pretty=True))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
+    def _write_json_chunks(self, f, records: List[Any]):
+        """Write a list as the same indented JSON array one dumps() call would produce, a chunk at a time."""
+        f.write(b'[\n')
+        for start in range(0, len(records), WRITE_CHUNK_RECORDS):
+            if start:
+                f.write(b',\n')
+            # Each chunk serializes as "[\n  ...\n]"; keep only its items
+            f.write(self.codec.dumps(records[start:start + WRITE_CHUNK_RECORDS], pretty=True)[2:-2])
+        f.write(b'\n]')
+    
+    def _snapshot_files(self) -> Dict[str, Path]:
+        """Single-file snapshot for each journaled table."""
+        return {
+            "companies": self.companies_file,
+            "people": self.people_file,
+            "email_stats": self.email_stats_file,
+        }
+    
+    def _tables(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """In-memory dict for each journaled table."""
+        return {
+            "companies": self._companies,
+            "people": self._people,
+            "email_stats": self._email_stats,
+        }
+    
+    # Sharding
+    def _is_sharded(self, table: str) -> bool:
+        """Whether a table's snapshot is split into shard files."""
+        return self.sharded and table in ("people", "email_stats")
+    
+    def _shard_of(self, table: str, record: Dict[str, Any]) -> ShardKey:
+        """Snapshot file/shard a record is stored in."""
+        if not self._is_sharded(table):
+            return table, None
+        if table == "people":
+            # crc32 rather than hash(): bucket assignment must be stable across processes
+            company_id = str(record.get('companyId'))
+            return table, f"bucket-{zlib.crc32(company_id.encode('utf-8')) % self.people_buckets:02d}"
+        sent_date = str(record.get('sentDate') or '')
+        return table, sent_date[:7] if _MONTH_PREFIX.match(sent_date) else "undated"
+    
+    def _snapshot_path(self, key: ShardKey) -> Path:
+        """Path of the snapshot file for a table or shard."""
+        table, shard = key
+        if shard is None:
+            return self._snapshot_files()[table]
+        return self.data_dir / table / f"{shard}.json"
+    
+    def _read_table(self, table: str) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """Read one table's snapshot from its single file or from its shard files.
+        
+        Returns:
+            The records keyed by id, and whether a single-file snapshot was read for
+            a sharded table (i.e. it still needs to be written out as shards).
+        """
+        if not self._is_sharded(table):
+            return {record['id']: record for record in self._read_json(self._snapshot_files()[table])}, False
+        
+        shard_dir = self.data_dir / table
+        if not shard_dir.is_dir():
+            records = self._read_json(self._snapshot_files()[table])
+            return {record['id']: record for record in records}, True
+        
+        records = {}
+        for shard_file in sorted(shard_dir.glob("*.json")):
+            for record in self._read_json(shard_file):
+                records[record['id']] = record
+        return records, False
+    
+    def _read_tables(self) -> Tuple[Dict[str, Dict[str, Dict[str, Any]]], int, JournalSignature, Set[ShardKey]]:
+        """Read the snapshot files and replay the journal on top (blocking, runs off the loop).
+        
+        Returns:
+            The tables keyed by name then record id, the number of journal entries
+            replayed, the journal signature they were read at, and the snapshot
+            files/shards that are behind the journal.
+        """
+        tables = {}
+        dirty = set()
+        for name in self._snapshot_files():
+            tables[name], needs_migration = self._read_table(name)
+            if needs_migration:
+                dirty.update(self._shard_of(name, record) for record in tables[name].values())
+        
+        journal_entries = self._replay_journal(tables, dirty)
+        return tables, journal_entries, self._journal_signature(), dirty
+    
+    def _install_tables(self, tables: Dict[str, Dict[str, Dict[str, Any]]], journal_entries: int,
+                        journal_signature: JournalSignature, dirty: Set[ShardKey]):
+        """Swap in freshly read tables and rebuild the derived indexes and counters."""
+        self._companies = tables["companies"]
+        self._people = tables["people"]
+        self._email_stats = tables["email_stats"]
+        self._journal_entries = journal_entries
+        self._journal_signature_seen = journal_signature
+        self._dirty = dirty
+        self._rebuild_indexes()
+        self._rebuild_company_stats()
+        self._loaded = True
+    
+    async def _run_io(self, func, *args):
+        """Run blocking file I/O on the storage's I/O thread so the event loop stays free.
+        
+        The executor has a single worker, so I/O runs in submission order and
+        journal appends land in the same order as the mutations they record.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, func, *args)
+    
+    async def _ensure_loaded(self):
+        """Make sure the in-memory tables reflect the data files."""
+        stale = not self._loaded or not self.in_memory
+        if not stale and self.process_lock:
+            # Another worker sharing the data directory may have written since we last looked
+            stale = await self._run_io(self._journal_signature) != self._journal_signature_seen
+        if stale:
+            self._install_tables(*await self._run_io(self._read_tables))
+    
+    async def reload(self):
+        """Discard the in-memory tables and re-read the data files."""
+        async with self._lock():
+            self._install_tables(*await self._run_io(self._read_tables))
+    
+    # Locking
+    def _acquire_process_lock(self, exclusive: bool = True):
+        """Block until this process holds the data directory's file lock (blocking).
+        
+        Readers share the lock with each other; a writer holds it alone.
+        """
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    
+    def _release_process_lock(self):
+        """Release the data directory's file lock (blocking)."""
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+    
+    def _write_generation(self) -> int:
+        """Number of journal writes/compactions ever made in the data directory (blocking).
+        
+        Kept in the lock file, and only bumped under the exclusive lock, so it
+        never repeats: unlike the journal's inode and size, which can recur once
+        a compaction frees the old journal's inode.
+        """
+        if not self.process_lock:
+            return 0
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        data = os.pread(self._lock_fd, 20, 0)
+        return int(data) if data.strip() else 0
+    
+    def _bump_write_generation(self):
+        """Record a journal write or compaction; callers hold the exclusive lock (blocking)."""
+        if self.process_lock:
+            os.pwrite(self._lock_fd, b"%020d" % (self._write_generation() + 1), 0)
+    
+    @asynccontextmanager
+    async def _lock(self, *tables: str):
+        """Hold the locks for the given tables, plus the cross-process lock when enabled.
+        
+        Reads pass no tables and take the cross-process lock shared: they only need
+        to keep other workers from writing midway through, not from reading. Writes
+        pass the tables they change and take it exclusively. Within this process the
+        lock is handed out one holder at a time.
+        """
+        async with AsyncExitStack() as stack:
+            for name in tables:
+                await stack.enter_async_context(self._table_locks[name])
+            if self.process_lock:
+                await stack.enter_async_context(self._process_mutex)
+                await self._run_io(self._acquire_process_lock, bool(tables))
+                stack.push_async_callback(self._run_io, self._release_process_lock)
+            yield
+    
+    # Journal
+    def _replay_journal(self, tables: Dict[str, Dict[str, Dict[str, Any]]], dirty: Set[ShardKey]) -> int:
+        """Apply the mutations journaled since the last compaction to the given tables.
+        
+        The snapshot files/shards the replayed records belong to are added to dirty.
+        
+        Returns:
+            Number of journal entries applied.
+        """
+        if not self.journal_file.exists():
+            return 0
+        
+        journal_entries = 0
+        valid_bytes = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                # A crash mid-append leaves a torn last line; stop at the last complete entry
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = self.codec.loads(line)
+                except json.JSONDecodeError:
+                    break
+                valid_bytes += len(line)
+                journal_entries += 1
+                
+                name = entry.get('table')
+                table = tables.get(name)
+                if table is None:
+                    continue
+                if entry['op'] == 'put':
+                    record = entry['record']
+                    previous = table.get(record['id'])
+                    if previous is not None:
+                        dirty.add(self._shard_of(name, previous))
+                    table[record['id']] = record
+                    dirty.add(self._shard_of(name, record))
+                elif entry['op'] == 'delete':
+                    previous = table.pop(entry['id'], None)
+                    if previous is not None:
+                        dirty.add(self._shard_of(name, previous))
+        
+        # Drop the torn tail so later appends start on a clean line
+        if valid_bytes < self.journal_file.stat().st_size:
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_bytes)
+        
+        return journal_entries
+    
+    def _journal_signature(self) -> JournalSignature:
+        """(write generation, inode, size) of the journal; changes whenever any process writes to it."""
+        generation = self._write_generation()
+        try:
+            stat = os.stat(self.journal_file)
+        except FileNotFoundError:
+            return generation, None, None
+        return generation, stat.st_ino, stat.st_size
+    
+    def _write_journal_line(self, line: bytes) -> JournalSignature:
+        """Durably append one serialized entry to the journal (blocking).
+        
+        Returns:
+            The journal signature after the append.
+        """
+        with open(self.journal_file, 'ab') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._bump_write_generation()
+        return self._journal_signature()
+    
+    async def _append_journal(self, entry: Dict[str, Any]):
+        """Append one mutation to the journal, compacting when it grows too long."""
+        # Serialize now: the record may be mutated again before the I/O thread gets to it
+        line = self.codec.dumps(entry) + b'\n'
+        self._journal_signature_seen = await self._run_io(self._write_journal_line, line)
+        
+        self._journal_entries += 1
+        if self._journal_entries >= self.compact_threshold:
+            await self._compact()
+    
+    async def _journal_put(self, table: str, record: Dict[str, Any]):
+        """Journal the current state of a created or updated record."""
+        self._dirty.add(self._shard_of(table, record))
+        await self._append_journal({"table": table, "op": "put", "record": record})
+    
+    async def _journal_delete(self, table: str, record: Dict[str, Any]):
+        """Journal the deletion of a record."""
+        self._dirty.add(self._shard_of(table, record))
+        await self._append_journal({"table": table, "op": "delete", "id": record['id']})
+    
+    def _write_snapshots(self, snapshots: Dict[ShardKey, List[Dict[str, Any]]]) -> JournalSignature:
+        """Write the given snapshot files/shards and start a fresh journal (blocking).
+        
+        Returns:
+            The signature of the new, empty journal.
+        """
+        for key, records in snapshots.items():
+            file_path = self._snapshot_path(key)
+            if key[1] is not None and not records:
+                # Shards only exist while they hold records
+                file_path.unlink(missing_ok=True)
+                continue
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            self._write_json(file_path, records)
+        
+        # Snapshots now hold every journaled mutation; replaying them again is harmless.
+        # Replacing (not truncating) gives the journal a new inode other workers can spot.
+        tmp_path = self.journal_file.with_name(f".{self.journal_file.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8'):
+            pass
+        os.replace(tmp_path, self.journal_file)
+        self._bump_write_generation()
+        return self._journal_signature()
+    
+    @staticmethod
+    def _collect_snapshots(tables: Dict[str, Dict[str, Dict[str, Any]]], dirty: Set[ShardKey],
+                           shard_of) -> Dict[ShardKey, List[Dict[str, Any]]]:
+        """Copy the records of the given snapshot files/shards out of the tables."""
+        snapshots = {key: [] for key in dirty}
+        dirty_tables = {table for table, _ in dirty}
+        for name, table in tables.items():
+            if name not in dirty_tables:
+                continue
+            for record in table.values():
+                shard_records = snapshots.get(shard_of(name, record))
+                if shard_records is not None:
+                    shard_records.append(dict(record))
+        return snapshots
+    
+    async def _compact(self, writers_paused: bool = False):
+        """Compaction body; callers must already hold the locks they need.
+        
+        Only the files/shards holding changed records are rewritten. Their records
+        are copied on the loop, so the I/O thread never sees a dict the loop is
+        updating, unless writers_paused says every table lock is held: then nothing
+        can change them and the copy runs on the I/O thread too.
+        """
+        await self._ensure_loaded()
+        
+        dirty = self._dirty
+        self._dirty = set()
+        self._journal_entries = 0
+        if writers_paused:
+            snapshots = await self._run_io(self._collect_snapshots, self._tables(), dirty, self._shard_of)
+        else:
+            snapshots = self._collect_snapshots(self._tables(), dirty, self._shard_of)
+        self._journal_signature_seen = await self._run_io(self._write_snapshots, snapshots)
+    
+    async def compact(self):
+        """Fold the journal into the JSON snapshot files and truncate it.
+        
+        Writes wait until it is done; reads carry on meanwhile.
+        """
+        async with self._lock(*self._table_locks):
+            await self._compact(writers_paused=True)
     
     def _ensure_profile_file(self):
         """Ensure profile.json exists with default data"""
@@ -88,8 +532,7 @@ class JSONStorage:
                     "body": ""
                 }
             }
-            with open(self.profile_file, 'w', encoding='utf-8') as f:
-                json.dump(default_data, f, indent=2, ensure_ascii=False)
+            self._write_json(self.profile_file, default_data)
     
     def _load_profile_data(self) -> Dict[str, Any]:
         """Load profile data from JSON file"""
@@ -103,41 +546,141 @@ class JSONStorage:
     
     def _save_profile_data(self, data: Dict[str, Any]):
         """Save profile data to JSON file"""
-        with open(self.profile_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._write_json(self.profile_file, data)
     
-    def _calculate_company_stats(self, company_id: str) -> Dict[str, Any]:
-        """Calculate statistics for a company based on people and email data."""
-        people_data = self._read_json(self.people_file)
-        email_stats_data = self._read_json(self.email_stats_file)
-        
-        # Get people for this company
-        company_people = [p for p in people_data if p.get('companyId') == company_id]
+    def _rebuild_indexes(self):
+        """Rebuild the sorted id lists and companyId/personId secondary indexes from the loaded tables."""
+        self._sorted_ids = {name: sorted(table) for name, table in self._tables().items()}
+        self._people_by_company = {}
+        self._email_stats_by_person = {}
+        self._email_stats_by_company = {}
+        for person_data in self._people.values():
+            self._index_person(person_data)
+        for stat_data in self._email_stats.values():
+            self._index_email_stat(stat_data)
+    
+    @staticmethod
+    def _index_add(index: Dict[str, Dict[str, Dict[str, Any]]], key: Optional[str], record: Dict[str, Any]):
+        """Add a record to a secondary index bucket."""
+        index.setdefault(key, {})[record['id']] = record
+    
+    @staticmethod
+    def _index_remove(index: Dict[str, Dict[str, Dict[str, Any]]], key: Optional[str], record_id: str):
+        """Remove a record from a secondary index bucket, dropping the bucket once empty."""
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(record_id, None)
+        if not bucket:
+            del index[key]
+    
+    def _track_id(self, table: str, record_id: str):
+        """Add a new record id to its table's sorted id list."""
+        insort(self._sorted_ids[table], record_id)
+    
+    def _untrack_id(self, table: str, record_id: str):
+        """Remove a deleted record id from its table's sorted id list."""
+        ids = self._sorted_ids[table]
+        position = bisect_left(ids, record_id)
+        if position < len(ids) and ids[position] == record_id:
+            del ids[position]
+    
+    @staticmethod
+    def _keyset_page(sorted_ids: List[str], limit: int, after: Optional[str]) -> Tuple[List[str], Optional[str]]:
+        """Slice one page of ids that sort strictly after the cursor.
         
-        # Get email stats for this company
-        company_emails = [e for e in email_stats_data if e.get('companyId') == company_id]
+        Returns:
+            The page's ids and the cursor for the next page (None on the last page).
+        """
+        start = bisect_right(sorted_ids, after) if after is not None else 0
+        page_ids = sorted_ids[start:start + limit]
+        next_cursor = page_ids[-1] if start + limit < len(sorted_ids) else None
+        return page_ids, next_cursor
+    
+    def _index_person(self, person_data: Dict[str, Any]):
+        """Register a person in the companyId index."""
+        self._index_add(self._people_by_company, person_data.get('companyId'), person_data)
+    
+    def _unindex_person(self, person_data: Dict[str, Any]):
+        """Remove a person from the companyId index."""
+        self._index_remove(self._people_by_company, person_data.get('companyId'), person_data['id'])
+    
+    def _index_email_stat(self, stat_data: Dict[str, Any]):
+        """Register an email stat in the personId and companyId indexes."""
+        self._index_add(self._email_stats_by_person, stat_data.get('personId'), stat_data)
+        self._index_add(self._email_stats_by_company, stat_data.get('companyId'), stat_data)
+    
+    def _rebuild_company_stats(self):
+        """Recompute the per-company aggregate counters from the loaded tables."""
+        self._company_counters = {}
+        self._summary_totals = dict.fromkeys(SUMMARY_KEYS, 0)
+        for person_data in self._people.values():
+            self._apply_person_to_stats(person_data, 1)
+        for stat_data in self._email_stats.values():
+            self._apply_email_stat_to_stats(stat_data, 1)
+    
+    def _counters_for(self, company_id: str) -> Dict[str, int]:
+        """Get (creating if needed) the aggregate counters for a company."""
+        counters = self._company_counters.get(company_id)
+        if counters is None:
+            counters = dict.fromkeys(COMPANY_COUNTER_KEYS, 0)
+            self._company_counters[company_id] = counters
+        return counters
+    
+    def _apply_person_to_stats(self, person_data: Dict[str, Any], sign: int):
+        """Add (sign=1) or remove (sign=-1) a person's contribution to its company's counters."""
+        company_id = person_data.get('companyId')
+        counters = self._counters_for(company_id)
+        was_responded = counters['respondedPeople'] > 0
+        open_delta = sign * (person_data.get('openCount') or 0)
+        click_delta = sign * (person_data.get('clickCount') or 0)
         
-        # Calculate stats
-        total_people = len(company_people)
-        total_emails = len(company_emails)
+        counters['totalPeople'] += sign
+        counters['openedPeople'] += sign * bool(person_data.get('opened', False))
+        counters['openCount'] += open_delta
+        counters['clickedPeople'] += sign * bool(person_data.get('clicked', False))
+        counters['clickCount'] += click_delta
+        counters['resumeOpenCount'] += sign * (person_data.get('resumeOpenCount') or 0)
+        counters['respondedPeople'] += sign * bool(person_data.get('responded', False))
         
-        # Calculate opens, clicks, responses
-        has_opened = any(p.get('opened', False) for p in company_people)
-        open_count = sum(p.get('openCount', 0) for p in company_people)
-        has_clicked = any(p.get('clicked', False) for p in company_people)
-        click_count = sum(p.get('clickCount', 0) for p in company_people)
-        resume_open_count = sum(p.get('resumeOpenCount', 0) for p in company_people)
-        has_responded = any(p.get('responded', False) for p in company_people)
+        # People of unknown companies never show up in the dashboard totals
+        if company_id in self._companies:
+            self._summary_totals['totalOpens'] += open_delta
+            self._summary_totals['totalClicks'] += click_delta
+            self._summary_totals['totalResponses'] += (counters['respondedPeople'] > 0) - was_responded
+    
+    def _apply_email_stat_to_stats(self, stat_data: Dict[str, Any], sign: int):
+        """Add (sign=1) or remove (sign=-1) an email stat's contribution to its company's counters."""
+        company_id = stat_data.get('companyId')
+        self._counters_for(company_id)['totalEmails'] += sign
+        if company_id in self._companies:
+            self._summary_totals['totalEmails'] += sign
+    
+    def _apply_company_to_summary(self, company_id: str, sign: int):
+        """Add (sign=1) or remove (sign=-1) a company's counters to/from the dashboard totals."""
+        counters = self._company_counters.get(company_id)
+        if counters is None:
+            return
+        self._summary_totals['totalEmails'] += sign * counters['totalEmails']
+        self._summary_totals['totalOpens'] += sign * counters['openCount']
+        self._summary_totals['totalClicks'] += sign * counters['clickCount']
+        self._summary_totals['totalResponses'] += sign * (counters['respondedPeople'] > 0)
+    
+    def _calculate_company_stats(self, company_id: str) -> Dict[str, Any]:
+        """Get statistics for a company from its maintained aggregate counters."""
+        counters = self._company_counters.get(company_id)
+        if counters is None:
+            counters = dict.fromkeys(COMPANY_COUNTER_KEYS, 0)
         
         return {
-            'total_people': total_people,
-            'total_emails': total_emails,
-            'has_opened': has_opened,
-            'open_count': open_count,
-            'has_clicked': has_clicked,
-            'click_count': click_count,
-            'resume_open_count': resume_open_count,
-            'has_responded': has_responded
+            'totalPeople': counters['totalPeople'],
+            'totalEmails': counters['totalEmails'],
+            'hasOpened': counters['openedPeople'] > 0,
+            'openCount': counters['openCount'],
+            'hasClicked': counters['clickedPeople'] > 0,
+            'clickCount': counters['clickCount'],
+            'resumeOpenCount': counters['resumeOpenCount'],
+            'hasResponded': counters['respondedPeople'] > 0
         }
     
     def _normalize_website_url(self, url: str) -> str:
@@ -151,225 +694,308 @@ class JSONStorage:
     # Companies
     async def get_companies(self) -> List[Company]:
         """Get all companies."""
-        companies_data = self._read_json(self.companies_file)
-        companies = []
-        
-        for company_data in companies_data:
-            # Ensure crunchbase field is included
-            if not company_data.get('crunchbase'):
-                name = company_data.get('name', '').lower().replace(' ', '-')
-                company_data['crunchbase'] = f"https://crunchbase.com/organization/{name}"
-            
-            # Calculate and add current stats
-            stats = self._calculate_company_stats(company_data['id'])
-            company_data.update(stats)
-            
-            companies.append(Company(**company_data))
+        async with self._lock():
+            await self._ensure_loaded()
+            return [self._company_listing(record) for record in self._companies.values()]
+    
+    async def get_companies_page(self, limit: int, after: Optional[str] = None) -> Tuple[List[Company], Optional[str]]:
+        """Get one page of companies ordered by id, starting after the given cursor.
         
-        return companies
+        Returns:
+            The companies and the cursor for the next page (None on the last page).
+        """
+        async with self._lock():
+            await self._ensure_loaded()
+            page_ids, next_cursor = self._keyset_page(self._sorted_ids["companies"], limit, after)
+            return [self._company_listing(self._companies[company_id]) for company_id in page_ids], next_cursor
     
-    async def get_company(self, company_id: str) -> Optional[Company]:
-        """Get a company by ID."""
-        companies_data = self._read_json(self.companies_file)
+    def _company_listing(self, record: Dict[str, Any]) -> Company:
+        """Build a company for list responses, with a default crunchbase URL and current stats."""
+        company_data = dict(record)
+        
+        # Ensure crunchbase field is included
+        if not company_data.get('crunchbase'):
+            name = company_data.get('name', '').lower().replace(' ', '-')
+            company_data['crunchbase'] = f"https://crunchbase.com/organization/{name}"
         
-        for company_data in companies_data:
-            if company_data['id'] == company_id:
-                # Calculate and add current stats
-                stats = self._calculate_company_stats(company_id)
-                company_data.update(stats)
-                return Company(**company_data)
+        # Calculate and add current stats
+        stats = self._calculate_company_stats(company_data['id'])
+        company_data.update(stats)
         
-        return None
+        return Company(**company_data)
+    
+    async def get_company(self, company_id: str) -> Optional[Company]:
+        """Get a company by ID."""
+        async with self._lock():
+            await self._ensure_loaded()
+            
+            record = self._companies.get(company_id)
+            if record is None:
+                return None
+            
+            # Calculate and add current stats
+            company_data = dict(record)
+            company_data.update(self._calculate_company_stats(company_id))
+            return Company(**company_data)
     
     async def create_company(self, company: CompanyCreate) -> Company:
         """Create a new company."""
-        companies_data = self._read_json(self.companies_file)
-        
-        # Generate new ID
-        new_id = str(uuid4())
-        
-        # Get the input data with aliases
-        input_data = company.model_dump(by_alias=True)
-        
-        # Create company data with proper defaults
-        company_data = {
-            "id": new_id,
-            "name": input_data["name"],
-            "website": self._normalize_website_url(input_data["website"]),
-            "linkedin": input_data.get("linkedin"),
-            "crunchbase": input_data.get("crunchbase"),
-            "companySize": input_data.get("companySize"),
-            "lastAttempt": input_data.get("lastAttempt"),
-            "decision": input_data.get("decision"),
-            # Default calculated fields
-            "totalEmails": 0,
-            "totalPeople": 0,
-            "hasOpened": False,
-            "openCount": 0,
-            "hasClicked": False,
-            "clickCount": 0,
-            "resumeOpenCount": 0,
-            "hasResponded": False,
-        }
-        
-        companies_data.append(company_data)
-        self._write_json(self.companies_file, companies_data)
-        
-        return Company(**company_data)
+        async with self._lock("companies"):
+            await self._ensure_loaded()
+            
+            # Generate new ID
+            new_id = str(uuid4())
+            
+            # Get the input data with aliases
+            input_data = company.model_dump(by_alias=True)
+            
+            # Create company data with proper defaults
+            company_data = {
+                "id": new_id,
+                "name": input_data["name"],
+                "website": self._normalize_website_url(input_data["website"]),
+                "linkedin": input_data.get("linkedin"),
+                "crunchbase": input_data.get("crunchbase"),
+                "companySize": input_data.get("companySize"),
+                "lastAttempt": input_data.get("lastAttempt"),
+                "decision": input_data.get("decision"),
+                # Default calculated fields
+                "totalEmails": 0,
+                "totalPeople": 0,
+                "hasOpened": False,
+                "openCount": 0,
+                "hasClicked": False,
+                "clickCount": 0,
+                "resumeOpenCount": 0,
+                "hasResponded": False,
+            }
+            
+            self._companies[new_id] = company_data
+            self._track_id("companies", new_id)
+            self._apply_company_to_summary(new_id, 1)
+            await self._journal_put("companies", company_data)
+            
+            return Company(**company_data)
     
     async def update_company(self, company_id: str, updates: CompanyUpdate) -> Optional[Company]:
         """Update a company."""
-        companies_data = self._read_json(self.companies_file)
-        
-        for i, company_data in enumerate(companies_data):
-            if company_data['id'] == company_id:
-                # Update the company data
-                update_data = updates.model_dump(exclude_unset=True, by_alias=True)
-                if 'website' in update_data:
-                    update_data['website'] = self._normalize_website_url(update_data['website'])
-                
-                companies_data[i].update(update_data)
-                self._write_json(self.companies_file, companies_data)
-                
-                return Company(**companies_data[i])
-        
-        return None
+        async with self._lock("companies"):
+            await self._ensure_loaded()
+            
+            company_data = self._companies.get(company_id)
+            if company_data is None:
+                return None
+            
+            # Update the company data
+            update_data = updates.model_dump(exclude_unset=True, by_alias=True)
+            if 'website' in update_data:
+                update_data['website'] = self._normalize_website_url(update_data['website'])
+            
+            company_data.update(update_data)
+            await self._journal_put("companies", company_data)
+            
+            return Company(**company_data)
     
     async def delete_company(self, company_id: str) -> bool:
         """Delete a company."""
-        companies_data = self._read_json(self.companies_file)
-        
-        for i, company_data in enumerate(companies_data):
-            if company_data['id'] == company_id:
-                companies_data.pop(i)
-                self._write_json(self.companies_file, companies_data)
-                return True
-        
-        return False
+        async with self._lock("companies"):
+            await self._ensure_loaded()
+            
+            company_data = self._companies.pop(company_id, None)
+            if company_data is None:
+                return False
+            
+            self._untrack_id("companies", company_id)
+            self._apply_company_to_summary(company_id, -1)
+            await self._journal_delete("companies", company_data)
+            return True
     
     # People
     async def get_people(self) -> List[Person]:
         """Get all people."""
-        people_data = self._read_json(self.people_file)
-        return [Person(**person_data) for person_data in people_data]
+        async with self._lock():
+            await self._ensure_loaded()
+            return [Person(**person_data) for person_data in self._people.values()]
     
     async def get_people_by_company(self, company_id: str) -> List[Person]:
         """Get all people for a specific company."""
-        people_data = self._read_json(self.people_file)
-        
-        company_people = []
-        for person_data in people_data:
-            if person_data['companyId'] == company_id:
-                company_people.append(Person(**person_data))
+        async with self._lock():
+            await self._ensure_loaded()
+            
+            company_people = self._people_by_company.get(company_id, {})
+            return [Person(**person_data) for person_data in company_people.values()]
+    
+    async def get_people_page(self, limit: int, after: Optional[str] = None,
+                              company_id: Optional[str] = None) -> Tuple[List[Person], Optional[str]]:
+        """Get one page of people ordered by id, optionally only those of one company.
         
-        return company_people
+        Returns:
+            The people and the cursor for the next page (None on the last page).
+        """
+        async with self._lock():
+            await self._ensure_loaded()
+            if company_id is None:
+                records, sorted_ids = self._people, self._sorted_ids["people"]
+            else:
+                records = self._people_by_company.get(company_id, {})
+                sorted_ids = sorted(records)
+            page_ids, next_cursor = self._keyset_page(sorted_ids, limit, after)
+            return [Person(**records[person_id]) for person_id in page_ids], next_cursor
     
     async def get_person(self, person_id: str) -> Optional[Person]:
         """Get a person by ID."""
-        people_data = self._read_json(self.people_file)
-        
-        for person_data in people_data:
-            if person_data['id'] == person_id:
-                return Person(**person_data)
-        
-        return None
+        async with self._lock():
+            await self._ensure_loaded()
+            
+            person_data = self._people.get(person_id)
+            if person_data is None:
+                return None
+            
+            return Person(**person_data)
     
     async def create_person(self, person: PersonCreate) -> Person:
         """Create a new person."""
-        people_data = self._read_json(self.people_file)
-        
-        # Generate new ID
-        new_id = str(uuid4())
-        
-        # Create person data
-        person_data = {
-            **person.model_dump(),
-            "id": new_id,
-            "position": person.position,
-            "linkedin": person.linkedin,
-            "city": person.city,
-            "country": person.country,
-            "attempts": person.attempts or 0,
-            "lastEmailDate": person.lastEmailDate,
-            "opened": person.opened or False,
-            "openCount": person.openCount or 0,
-            "clicked": person.clicked or False,
-            "clickCount": person.clickCount or 0,
-            "resumeOpened": person.resumeOpened or False,
-            "resumeOpenCount": person.resumeOpenCount or 0,
-            "responded": person.responded or False,
-        }
-        
-        people_data.append(person_data)
-        self._write_json(self.people_file, person_data)
-        
-        return Person(**person_data)
+        async with self._lock("people"):
+            await self._ensure_loaded()
+            
+            # Generate new ID
+            new_id = str(uuid4())
+            
+            # Create person data (stored with camelCase keys like the seed data)
+            person_data = {
+                **person.model_dump(by_alias=True),
+                "id": new_id,
+                "attempts": 0,
+                "opened": False,
+                "openCount": 0,
+                "clicked": False,
+                "clickCount": 0,
+                "resumeOpened": False,
+                "resumeOpenCount": 0,
+                "responded": False,
+            }
+            
+            self._people[new_id] = person_data
+            self._track_id("people", new_id)
+            self._index_person(person_data)
+            self._apply_person_to_stats(person_data, 1)
+            await self._journal_put("people", person_data)
+            
+            return Person(**person_data)
     
     async def update_person(self, person_id: str, updates: PersonCreate) -> Optional[Person]:
         """Update a person."""
-        people_data = self._read_json(self.people_file)
-        
-        for i, person_data in enumerate(people_data):
-            if person_data['id'] == person_id:
-                # Update the person data
-                update_data = updates.model_dump(exclude_unset=True)
-                people_data[i].update(update_data)
-                self._write_json(self.people_file, people_data)
-                
-                return Person(**people_data[i])
-        
-        return None
+        async with self._lock("people"):
+            await self._ensure_loaded()
+            
+            person_data = self._people.get(person_id)
+            if person_data is None:
+                return None
+            
+            # Update the person data
+            update_data = updates.model_dump(exclude_unset=True, by_alias=True)
+            # A companyId change moves the person to another shard; the old one needs rewriting too
+            self._dirty.add(self._shard_of("people", person_data))
+            self._unindex_person(person_data)
+            self._apply_person_to_stats(person_data, -1)
+            person_data.update(update_data)
+            self._index_person(person_data)
+            self._apply_person_to_stats(person_data, 1)
+            await self._journal_put("people", person_data)
+            
+            return Person(**person_data)
     
     async def delete_person(self, person_id: str) -> bool:
         """Delete a person."""
-        people_data = self._read_json(self.people_file)
-        
-        for i, person_data in enumerate(people_data):
-            if person_data['id'] == person_id:
-                people_data.pop(i)
-                self._write_json(self.people_file, people_data)
-                return True
-        
-        return False
+        async with self._lock("people"):
+            await self._ensure_loaded()
+            
+            person_data = self._people.pop(person_id, None)
+            if person_data is None:
+                return False
+            
+            self._untrack_id("people", person_id)
+            self._unindex_person(person_data)
+            self._apply_person_to_stats(person_data, -1)
+            await self._journal_delete("people", person_data)
+            return True
     
     # Email Stats
     async def get_email_stats(self) -> List[EmailStat]:
         """Get all email statistics."""
-        email_stats_data = self._read_json(self.email_stats_file)
-        return [EmailStat(**stat_data) for stat_data in email_stats_data]
+        async with self._lock():
+            await self._ensure_loaded()
+            return [EmailStat(**stat_data) for stat_data in self._email_stats.values()]
     
     async def get_email_stats_by_person(self, person_id: str) -> List[EmailStat]:
         """Get email statistics for a specific person."""
-        email_stats_data = self._read_json(self.email_stats_file)
-        
-        person_stats = []
-        for stat_data in email_stats_data:
-            if stat_data['personId'] == person_id:
-                person_stats.append(EmailStat(**stat_data))
+        async with self._lock():
+            await self._ensure_loaded()
+            
+            person_stats = self._email_stats_by_person.get(person_id, {})
+            return [EmailStat(**stat_data) for stat_data in person_stats.values()]
+    
+    async def get_email_stats_by_company(self, company_id: str) -> List[EmailStat]:
+        """Get email statistics for a specific company."""
+        async with self._lock():
+            await self._ensure_loaded()
+            
+            company_stats = self._email_stats_by_company.get(company_id, {})
+            return [EmailStat(**stat_data) for stat_data in company_stats.values()]
+    
+    async def get_email_stats_page(self, limit: int, after: Optional[str] = None,
+                                   person_id: Optional[str] = None,
+                                   company_id: Optional[str] = None) -> Tuple[List[EmailStat], Optional[str]]:
+        """Get one page of email statistics ordered by id, optionally filtered by person or company.
         
-        return person_stats
+        Returns:
+            The email stats and the cursor for the next page (None on the last page).
+        """
+        async with self._lock():
+            await self._ensure_loaded()
+            if person_id is not None:
+                records = self._email_stats_by_person.get(person_id, {})
+                sorted_ids = sorted(records)
+            elif company_id is not None:
+                records = self._email_stats_by_company.get(company_id, {})
+                sorted_ids = sorted(records)
+            else:
+                records, sorted_ids = self._email_stats, self._sorted_ids["email_stats"]
+            page_ids, next_cursor = self._keyset_page(sorted_ids, limit, after)
+            return [EmailStat(**records[stat_id]) for stat_id in page_ids], next_cursor
     
     async def create_email_stat(self, email_stat: EmailStatCreate) -> EmailStat:
         """Create a new email statistic."""
-        email_stats_data = self._read_json(self.email_stats_file)
-        
-        # Generate new ID
-        new_id = str(uuid4())
-        
-        # Create email stat data
-        stat_data = {
-            **email_stat.model_dump(),
-            "id": new_id,
-            "openCount": email_stat.openCount or 0,
-            "clickCount": email_stat.clickCount or 0,
-            "resumeOpenCount": email_stat.resumeOpenCount or 0,
-            "responded": email_stat.responded or False,
-        }
-        
-        email_stats_data.append(stat_data)
-        self._write_json(self.email_stats_file, email_stats_data)
-        
-        return EmailStat(**stat_data)
+        async with self._lock("email_stats"):
+            await self._ensure_loaded()
+            
+            # Generate new ID
+            new_id = str(uuid4())
+            
+            # Create email stat data
+            stat_data = {
+                **email_stat.model_dump(by_alias=True),
+                "id": new_id,
+                "openCount": 0,
+                "clickCount": 0,
+                "resumeOpenCount": 0,
+                "responded": False,
+            }
+            
+            self._email_stats[new_id] = stat_data
+            self._track_id("email_stats", new_id)
+            self._index_email_stat(stat_data)
+            self._apply_email_stat_to_stats(stat_data, 1)
+            await self._journal_put("email_stats", stat_data)
+            
+            return EmailStat(**stat_data)
+    
+    # Stats
+    async def get_stats_summary(self) -> Dict[str, int]:
+        """Get the dashboard totals (emails, opens, clicks, responding companies) without touching any rows."""
+        async with self._lock():
+            await self._ensure_loaded()
+            return dict(self._summary_totals)
 
     # Profile operations
     def get_profile(self) -> Dict[str, Any]:
@@ -452,5 +1078,8 @@ class JSONStorage:
         return data["emailData"]
 
 
-# Global storage instance
-storage = JSONStorage()
+# Global storage instance; set STORAGE_PROCESS_LOCK=true when running several workers
+storage = JSONStorage(
+    process_lock=os.getenv("STORAGE_PROCESS_LOCK", "false").lower() == "true",
+    sharded=os.getenv("STORAGE_SHARDED", "false").lower() == "true",
+)
@@ -12,5 +12,5 @@ __all__ = [
 
 # Typical usage:
 # from database.xata import DatabaseManager
-# db = DatabaseManager()
+# db = DatabaseManager()                # or DatabaseManager(pool=True, max_size=20) for concurrent use
 # result = await db.select("name").from_("users").execute()
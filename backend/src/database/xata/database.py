@@ -1,15 +1,65 @@
 import json
+import time
 import asyncio
+import threading
 import logging
 import asyncpg
+import contextvars
 from pathlib import Path
 from datetime import datetime
 from urllib.parse import urlparse
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Callable
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL accepts at most this many bind parameters in one statement
+MAX_QUERY_PARAMS = 32767
+
+
+class SQLCache:
+    """
+    Generated SQL text keyed by query shape (table, fields, operators, order, limit presence)
+    
+    Queries of the same shape differ only in their parameter values, so their
+    SQL is built once. Identical text also lets asyncpg reuse the statement it
+    prepared for it on each connection, so the server doesn't re-plan it.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_build(self, shape: tuple, build: Callable[[], str]) -> str:
+        """Return the SQL cached for shape, building and caching it on a miss"""
+        with self._lock:
+            sql = self._entries.get(shape)
+            if sql is not None:
+                self._entries.move_to_end(shape)
+                self.hits += 1
+                return sql
+        
+        sql = build()
+        with self._lock:
+            self.misses += 1
+            self._entries[shape] = sql
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return sql
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+sql_cache = SQLCache()
+
 class PostgreSQLTypes:
     """PostgreSQL data types for type-safe column definitions"""
     
@@ -372,15 +422,39 @@ class OrderByQuery:
         """Add GROUP BY clause"""
         return self.parent.group_by(*columns)
     
+    def keyset(self, key: str, after: Any = None, limit: Optional[int] = None):
+        """Add keyset pagination"""
+        return self.parent.keyset(key, after, limit)
+    
     def distinct(self):
         """Add DISTINCT to SELECT"""
         return self.parent.distinct()
     
+    def _build(self):
+        """Build the query"""
+        return self.parent._build()
+    
     async def execute(self):
         """Execute the query"""
         return await self.parent.execute()
 
 
+class BuiltQuery:
+    """SQL text and parameters built by a query, plus how to shape the driver's result"""
+    
+    def __init__(self, table_name: str, sql: str, params: Optional[List[Any]] = None,
+                 fetch_results: bool = True, result: Optional[Callable[[Any], Any]] = None):
+        self.table_name = table_name
+        self.sql = sql
+        self.params = params or []
+        self.fetch_results = fetch_results
+        self.result = result
+    
+    def shape(self, raw: Any) -> Any:
+        """Turn the rows (or command tag) returned by _execute_query into the query's return value"""
+        return self.result(raw) if self.result else raw
+
+
 class BaseQuery:
     """Base class for all query types"""
     
@@ -430,54 +504,72 @@ class BaseQuery:
         self.offset_value = count
         return self
     
-    def _build_where_clause(self, params: list) -> str:
-        """Build WHERE clause from conditions"""
-        if not self.conditions:
-            return ""
-        
-        where_parts = []
-        for i, condition in enumerate(self.conditions):
+    def _where_shape(self) -> tuple:
+        """WHERE conditions without their values: (field, operator, logical) per condition"""
+        shape = []
+        for condition in self.conditions:
             field = condition["field"]
             operator = condition["operator"]
             value = condition["value"]
-            logical = condition["logical"]
             
             # Validate field name is not None or empty
             if not field or field is None:
                 raise ValueError(f"Field name cannot be None or empty in WHERE clause")
             
-            # Build the condition part
-            if operator == "IS NULL" or operator == "IS NOT NULL":
-                condition_sql = f"{field} {operator}"
-            elif operator == "BETWEEN" or operator == "NOT BETWEEN":
+            if operator == "BETWEEN" or operator == "NOT BETWEEN":
                 # Validate BETWEEN value is a tuple/list with exactly 2 elements
                 if not isinstance(value, (tuple, list)) or len(value) != 2:
                     raise ValueError(f"BETWEEN operator requires exactly 2 values, got: {value}")
                 if value[0] is None or value[1] is None:
                     raise ValueError(f"BETWEEN values cannot be None")
+            elif operator == "IN" or operator == "NOT IN":
+                # Validate IN values don't contain None
+                if any(val is None for val in value):
+                    raise ValueError(f"IN/NOT IN values cannot contain None")
+            
+            shape.append((field, operator, condition["logical"]))
+        return tuple(shape)
+    
+    def _where_params(self, params: list):
+        """Append the WHERE condition values to params, in placeholder order"""
+        for condition in self.conditions:
+            operator = condition["operator"]
+            value = condition["value"]
+            if operator == "IS NULL" or operator == "IS NOT NULL":
+                continue
+            elif operator == "BETWEEN" or operator == "NOT BETWEEN":
                 params.extend([value[0], value[1]])
-                param1_idx = len(params) - 1  # Second to last parameter
-                param2_idx = len(params)      # Last parameter
-                condition_sql = f"{field} {operator} ${param1_idx} AND ${param2_idx}"
             elif operator == "IN" or operator == "NOT IN":
-                if not value:  # Handle empty list
-                    # Empty IN list: return condition that matches nothing/everything
-                    if operator == "IN":
-                        condition_sql = "FALSE"  # IN () matches nothing
-                    else:  # NOT IN
-                        condition_sql = "TRUE"   # NOT IN () matches everything
-                else:
-                    # Validate IN values don't contain None
-                    if any(val is None for val in value):
-                        raise ValueError(f"IN/NOT IN values cannot contain None")
-                    placeholders = []
-                    for val in value:
-                        params.append(val)
-                        placeholders.append(f"${len(params)}")
-                    condition_sql = f"{field} {operator} ({', '.join(placeholders)})"
+                # Bound as one array, so the SQL doesn't depend on the list length
+                params.append(list(value))
             else:
                 params.append(value)
-                condition_sql = f"{field} {operator} ${len(params)}"
+    
+    @staticmethod
+    def _build_where_clause(where_shape: tuple, param_count: int) -> str:
+        """Build WHERE clause for a where shape, numbering placeholders after param_count"""
+        if not where_shape:
+            return ""
+        
+        where_parts = []
+        for i, (field, operator, logical) in enumerate(where_shape):
+            # Build the condition part
+            if operator == "IS NULL" or operator == "IS NOT NULL":
+                condition_sql = f"{field} {operator}"
+            elif operator == "BETWEEN" or operator == "NOT BETWEEN":
+                param_count += 2
+                condition_sql = f"{field} {operator} ${param_count - 1} AND ${param_count}"
+            elif operator == "IN":
+                # An empty array matches nothing
+                param_count += 1
+                condition_sql = f"{field} = ANY(${param_count})"
+            elif operator == "NOT IN":
+                # An empty array matches everything
+                param_count += 1
+                condition_sql = f"{field} <> ALL(${param_count})"
+            else:
+                param_count += 1
+                condition_sql = f"{field} {operator} ${param_count}"
             
             # Add logical operator if not first condition
             if i > 0:
@@ -495,16 +587,23 @@ class BaseQuery:
         order_parts = [f"{field} {direction}" for field, direction in self.order_fields]
         return f"ORDER BY {', '.join(order_parts)}"
     
-    def _build_limit_clause(self, params: list) -> str:
-        """Build LIMIT and OFFSET clause"""
-        clause = ""
+    def _limit_params(self, params: list):
+        """Append the LIMIT and OFFSET values to params"""
         if self.limit_value is not None:
             params.append(self.limit_value)
-            clause += f" LIMIT ${len(params)}"
-        
         if self.offset_value is not None:
             params.append(self.offset_value)
-            clause += f" OFFSET ${len(params)}"
+    
+    def _build_limit_clause(self, param_count: int) -> str:
+        """Build LIMIT and OFFSET clause, numbering placeholders after param_count"""
+        clause = ""
+        if self.limit_value is not None:
+            param_count += 1
+            clause += f" LIMIT ${param_count}"
+        
+        if self.offset_value is not None:
+            param_count += 1
+            clause += f" OFFSET ${param_count}"
         
         return clause
 
@@ -518,6 +617,8 @@ class SelectQuery(BaseQuery):
         self.table_name = None
         self.is_distinct = False
         self.group_fields = []
+        self.keyset_key = None
+        self.keyset_after = None
     
     def __call__(self, *fields):
         """Allow db.select("field1", "field2", count("*"), avg("age")) syntax
@@ -555,14 +656,51 @@ class SelectQuery(BaseQuery):
         self.group_fields.extend(columns)
         return self
     
-    async def execute(self):
-        """Execute the SELECT query"""
+    def keyset(self, key: str, after: Any = None, limit: Optional[int] = None):
+        """Keyset (seek) pagination on a unique, indexed column
+        
+        Adds `key > after` (when a cursor is given), orders by key ascending
+        and applies the limit, so each page is an index range scan instead of
+        an OFFSET that re-reads every skipped row. The key must be the only
+        ORDER BY column, otherwise pages would skip or repeat rows; the other
+        WHERE conditions are parenthesized before the cursor is ANDed on.
+        """
+        self.keyset_key = key
+        self.keyset_after = after
+        self.order_fields = [order for order in self.order_fields if order[0] != key]
+        self._add_order(key, "ASC")
+        if limit is not None:
+            self.limit_value = limit
+        return self
+    
+    def _build(self) -> BuiltQuery:
+        """Build the SELECT query"""
         if not self.table_name:
             raise ValueError("FROM clause is required for SELECT")
         
-        # Build SQL query
+        if self.keyset_key is not None and self.order_fields != [(self.keyset_key, "ASC")]:
+            raise ValueError(f"Keyset pagination on {self.keyset_key} cannot be combined with other ORDER BY columns")
+        
+        where_shape = self._where_shape()
+        cursor_key = self.keyset_key if self.keyset_after is not None else None
+        shape = (
+            "SELECT", self.table_name, tuple(self.select_fields or ()), self.is_distinct, where_shape, cursor_key,
+            tuple(self.group_fields), tuple(self.order_fields),
+            self.limit_value is not None, self.offset_value is not None
+        )
+        
         params = []
+        self._where_params(params)
+        if cursor_key is not None:
+            params.append(self.keyset_after)
+        where_param_count = len(params)
+        self._limit_params(params)
         
+        sql = sql_cache.get_or_build(shape, lambda: self._build_sql(where_shape, where_param_count, cursor_key))
+        return BuiltQuery(self.table_name, sql, params)
+    
+    def _build_sql(self, where_shape: tuple, where_param_count: int, cursor_key: Optional[str] = None) -> str:
+        """Build the SELECT statement text"""
         # SELECT clause
         fields = ", ".join(self.select_fields) if self.select_fields else "*"
         distinct_keyword = "DISTINCT " if self.is_distinct else ""
@@ -572,7 +710,14 @@ class SelectQuery(BaseQuery):
         sql += f" FROM {self.table_name}"
         
         # WHERE clause
-        where_clause = self._build_where_clause(params)
+        where_clause = self._build_where_clause(where_shape, 0)
+        if cursor_key is not None:
+            # The cursor placeholder is the last WHERE parameter
+            cursor_sql = f"{cursor_key} > ${where_param_count}"
+            if where_clause:
+                where_clause = f"WHERE ({where_clause[len('WHERE '):]}) AND {cursor_sql}"
+            else:
+                where_clause = f"WHERE {cursor_sql}"
         if where_clause:
             sql += f" {where_clause}"
         
@@ -587,14 +732,13 @@ class SelectQuery(BaseQuery):
             sql += f" {order_clause}"
         
         # LIMIT/OFFSET clause
-        limit_clause = self._build_limit_clause(params)
-        if limit_clause:
-            sql += limit_clause
-        
-        # Execute query
-        result = await self.db._execute_query(self.table_name, sql, params)
+        sql += self._build_limit_clause(where_param_count)
         
-        return result
+        return sql
+    
+    async def execute(self):
+        """Execute the SELECT query"""
+        return await self.db._run(self._build())
 
 
 class ConflictResolution:
@@ -609,9 +753,25 @@ class ConflictResolution:
         self.insert_query.conflict_resolution = "DO_NOTHING"
         return self.insert_query
     
-    def do_update(self):
-        """Update existing record on conflict"""
+    def do_update(self, columns: Optional[List[str]] = None, only_if_changed: bool = False,
+                  timestamp_column: Optional[str] = None):
+        """
+        Update existing record on conflict (upsert), from the row that was proposed for insertion
+        
+        A bulk upsert must not propose the same conflict key twice: PostgreSQL
+        refuses to update one row twice in a single statement.
+        
+        Args:
+            columns: Columns to overwrite with their EXCLUDED values
+                (default: every inserted column outside the conflict target)
+            only_if_changed: Skip the update when those columns already hold the
+                proposed values, so unchanged rows are neither rewritten nor returned
+            timestamp_column: Column set to now() on every update (e.g. "updated_at")
+        """
         self.insert_query.conflict_resolution = "DO_UPDATE"
+        self.insert_query.update_columns = list(columns) if columns is not None else None
+        self.insert_query.update_only_if_changed = only_if_changed
+        self.insert_query.update_timestamp_column = timestamp_column
         return self.insert_query
 
 
@@ -624,6 +784,9 @@ class InsertQuery:
         self.data = None
         self.conflict_resolution = None
         self.conflict_column = None
+        self.update_columns = None
+        self.update_only_if_changed = False
+        self.update_timestamp_column = None
     
     def into(self, table: str):
         """INTO table clause"""
@@ -635,13 +798,41 @@ class InsertQuery:
         self.data = data
         return self
     
-    def on_conflict(self, column: str):
-        """Specify conflict resolution column"""
-        self.conflict_column = column
-        return ConflictResolution(self, column)
+    def on_conflict(self, *columns: str):
+        """Specify the conflict target: one or more columns of a unique index or constraint"""
+        if not columns or not all(columns):
+            raise ValueError("ON CONFLICT requires at least one column")
+        self.conflict_column = ", ".join(columns)
+        return ConflictResolution(self, self.conflict_column)
     
-    async def execute(self):
-        """Execute the INSERT query"""
+    def _build_conflict_clause(self, columns: List[str]) -> str:
+        """Build the ON CONFLICT clause for a statement inserting the given columns"""
+        if not (self.conflict_resolution and self.conflict_column):
+            return ""
+        if self.conflict_resolution == "DO_NOTHING":
+            return f" ON CONFLICT ({self.conflict_column}) DO NOTHING"
+        
+        # DO_UPDATE
+        conflict_columns = {column.strip() for column in self.conflict_column.split(",")}
+        update_columns = (
+            self.update_columns if self.update_columns is not None
+            else [column for column in columns if column not in conflict_columns]
+        )
+        if not update_columns:
+            raise ValueError("DO UPDATE needs at least one column outside the conflict target")
+        
+        set_clause = ", ".join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+        if self.update_timestamp_column:
+            set_clause += f", {self.update_timestamp_column} = now()"
+        clause = f" ON CONFLICT ({self.conflict_column}) DO UPDATE SET {set_clause}"
+        if self.update_only_if_changed:
+            current = ", ".join(f"{self.table_name}.{column}" for column in update_columns)
+            proposed = ", ".join(f"EXCLUDED.{column}" for column in update_columns)
+            clause += f" WHERE ({current}) IS DISTINCT FROM ({proposed})"
+        return clause
+    
+    def _build(self) -> Union[BuiltQuery, List[BuiltQuery]]:
+        """Build the INSERT query (a list of statements for bulk inserts too large for one)"""
         if not self.table_name:
             raise ValueError("INTO clause is required for INSERT")
         
@@ -651,11 +842,26 @@ class InsertQuery:
         
         # Handle bulk insert
         if isinstance(self.data, list):
-            return await self._bulk_insert()
+            return self._build_bulk_insert()
         
-        # Single insert
+        # Single insert (bulk insert text depends on the row count, so only these are cached)
         columns = list(self.data.keys())
         values = list(self.data.values())
+        shape = ("INSERT", self.table_name, tuple(columns), self._conflict_shape())
+        
+        sql = sql_cache.get_or_build(shape, lambda: self._build_single_sql(columns))
+        return BuiltQuery(self.table_name, sql, values, result=lambda rows: rows[0] if rows else None)
+    
+    def _conflict_shape(self) -> tuple:
+        """Everything the ON CONFLICT clause is built from"""
+        return (
+            self.conflict_resolution, self.conflict_column,
+            tuple(self.update_columns) if self.update_columns is not None else None,
+            self.update_only_if_changed, self.update_timestamp_column
+        )
+    
+    def _build_single_sql(self, columns: List[str]) -> str:
+        """Build the single-row INSERT statement text"""
         placeholders = [f"${i+1}" for i in range(len(columns))]
         
         sql = f"""
@@ -663,47 +869,53 @@ class InsertQuery:
             VALUES ({', '.join(placeholders)})"""
         
         # Add ON CONFLICT clause if specified
-        if self.conflict_resolution and self.conflict_column:
-            if self.conflict_resolution == "DO_NOTHING":
-                sql += f" ON CONFLICT ({self.conflict_column}) DO NOTHING"
-            elif self.conflict_resolution == "DO_UPDATE":
-                # TODO: Implement DO UPDATE logic later
-                raise NotImplementedError("DO UPDATE not yet implemented")
+        sql += self._build_conflict_clause(columns)
         
         sql += " RETURNING *"
-        
-        result = await self.db._execute_query(self.table_name, sql, values)
-        return result[0] if result else None
+        return sql
     
-    async def _bulk_insert(self):
-        """Handle bulk insert operations"""
-        if not self.data:
-            return []
-        
+    @staticmethod
+    def _bulk_columns(records: List[Dict[str, Any]]) -> List[str]:
+        """Validate bulk records and return their columns (the first record's keys)"""
         # Validate all records are dictionaries and not empty
-        for i, record in enumerate(self.data):
+        for i, record in enumerate(records):
             if not isinstance(record, dict):
                 raise ValueError(f"Bulk insert record {i} must be a dictionary")
             if not record:
                 raise ValueError(f"Bulk insert record {i} cannot be empty")
         
         # Use first record to determine columns
-        columns = list(self.data[0].keys())
+        columns = list(records[0].keys())
         
         # Validate all records have consistent schema (warn about missing keys)
         all_keys = set()
-        for record in self.data:
+        for record in records:
             all_keys.update(record.keys())
         
         if len(all_keys) > len(columns):
             missing_keys = all_keys - set(columns)
             print(f"Warning: Some records have additional keys that will be ignored: {missing_keys}")
         
+        return columns
+    
+    def _build_bulk_insert(self) -> Union[BuiltQuery, List[BuiltQuery]]:
+        """Build a bulk insert, split into statements that stay under the bind-parameter limit"""
+        columns = self._bulk_columns(self.data)
+        rows_per_statement = MAX_QUERY_PARAMS // len(columns)
+        
+        chunks = [
+            self._build_values(columns, self.data[start:start + rows_per_statement])
+            for start in range(0, len(self.data), rows_per_statement)
+        ]
+        return chunks[0] if len(chunks) == 1 else chunks
+    
+    def _build_values(self, columns: List[str], records: List[Dict[str, Any]]) -> BuiltQuery:
+        """Build one multi-row INSERT ... VALUES statement"""
         # Build bulk insert SQL
         values_clauses = []
         params = []
         
-        for record in self.data:
+        for record in records:
             record_values = [record.get(col) for col in columns]
             placeholders = [f"${len(params) + i + 1}" for i in range(len(columns))]
             values_clauses.append(f"({', '.join(placeholders)})")
@@ -714,16 +926,39 @@ class InsertQuery:
             VALUES {', '.join(values_clauses)}"""
         
         # Add ON CONFLICT clause if specified (bulk insert support)
-        if self.conflict_resolution and self.conflict_column:
-            if self.conflict_resolution == "DO_NOTHING":
-                sql += f" ON CONFLICT ({self.conflict_column}) DO NOTHING"
-            elif self.conflict_resolution == "DO_UPDATE":
-                # TODO: Implement DO UPDATE logic later
-                raise NotImplementedError("DO UPDATE not yet implemented for bulk insert")
+        sql += self._build_conflict_clause(columns)
         
         sql += " RETURNING *"
         
-        return await self.db._execute_query(self.table_name, sql, params)
+        return BuiltQuery(self.table_name, sql, params)
+    
+    async def execute(self):
+        """Execute the INSERT query"""
+        return await self.db._run(self._build())
+    
+    async def copy(self) -> int:
+        """
+        Bulk-load the VALUES records with COPY instead of INSERT
+        
+        Much faster than execute() for large loads and has no bind-parameter
+        limit, but returns only the number of rows written: use execute() when
+        the inserted rows (RETURNING) or ON CONFLICT handling are needed.
+        
+        Returns:
+            Number of rows copied
+        """
+        if not self.table_name:
+            raise ValueError("INTO clause is required for INSERT")
+        if not self.data:
+            raise ValueError("VALUES clause is required for INSERT")
+        if self.conflict_resolution:
+            raise ValueError("COPY can't resolve conflicts; use execute() for ON CONFLICT inserts")
+        
+        records = self.data if isinstance(self.data, list) else [self.data]
+        columns = self._bulk_columns(records)
+        return await self.db._copy_records(
+            self.table_name, columns, [tuple(record.get(col) for col in columns) for record in records]
+        )
 
 
 class UpdateQuery(BaseQuery):
@@ -739,32 +974,39 @@ class UpdateQuery(BaseQuery):
         self.update_data = data
         return self
     
-    async def execute(self):
-        """Execute the UPDATE query"""
+    def _build(self) -> BuiltQuery:
+        """Build the UPDATE query"""
         if not self.update_data:
             raise ValueError("SET clause is required for UPDATE")
+        if not self.conditions:
+            raise ValueError("WHERE clause is required for UPDATE (safety measure)")
         
-        # Build SQL query
-        params = []
+        columns = tuple(self.update_data.keys())
+        where_shape = self._where_shape()
+        shape = ("UPDATE", self.table_name, columns, where_shape)
         
-        # SET clause
-        set_clauses = []
-        for column, value in self.update_data.items():
-            params.append(value)
-            set_clauses.append(f"{column} = ${len(params)}")
+        # SET values come first, then the WHERE values
+        params = list(self.update_data.values())
+        self._where_params(params)
         
+        sql = sql_cache.get_or_build(shape, lambda: self._build_sql(columns, where_shape))
+        return BuiltQuery(self.table_name, sql, params)
+    
+    def _build_sql(self, columns: tuple, where_shape: tuple) -> str:
+        """Build the UPDATE statement text"""
+        # SET clause
+        set_clauses = [f"{column} = ${i + 1}" for i, column in enumerate(columns)]
         sql = f"UPDATE {self.table_name} SET {', '.join(set_clauses)}"
         
         # WHERE clause
-        where_clause = self._build_where_clause(params)
-        if where_clause:
-            sql += f" {where_clause}"
-        else:
-            raise ValueError("WHERE clause is required for UPDATE (safety measure)")
+        sql += f" {self._build_where_clause(where_shape, len(columns))}"
         
         sql += " RETURNING *"
-        
-        return await self.db._execute_query(self.table_name, sql, params)
+        return sql
+    
+    async def execute(self):
+        """Execute the UPDATE query"""
+        return await self.db._run(self._build())
 
 
 class DeleteQuery(BaseQuery):
@@ -779,26 +1021,28 @@ class DeleteQuery(BaseQuery):
         self.table_name = table
         return self
     
-    async def execute(self):
-        """Execute the DELETE query"""
+    def _build(self) -> BuiltQuery:
+        """Build the DELETE query"""
         if not self.table_name:
             raise ValueError("FROM clause is required for DELETE")
+        if not self.conditions:
+            raise ValueError("WHERE clause is required for DELETE (safety measure)")
         
-        # Build SQL query
+        where_shape = self._where_shape()
         params = []
-        sql = f"DELETE FROM {self.table_name}"
+        self._where_params(params)
         
-        # WHERE clause
-        where_clause = self._build_where_clause(params)
-        if where_clause:
-            sql += f" {where_clause}"
-        else:
-            raise ValueError("WHERE clause is required for DELETE (safety measure)")
-        
-        # Execute DELETE and get command tag
-        result = await self.db._execute_query(self.table_name, sql, params, fetch_results=False)
+        sql = sql_cache.get_or_build(
+            ("DELETE", self.table_name, where_shape),
+            lambda: f"DELETE FROM {self.table_name} {self._build_where_clause(where_shape, 0)}"
+        )
         
-        # Parse deleted count from command tag (e.g., "DELETE 5")
+        # DELETE returns a command tag rather than rows
+        return BuiltQuery(self.table_name, sql, params, fetch_results=False, result=self._deleted_count)
+    
+    @staticmethod
+    def _deleted_count(result) -> Dict[str, int]:
+        """Parse deleted count from command tag (e.g., "DELETE 5")"""
         deleted_count = 0
         if isinstance(result, str) and result.startswith("DELETE"):
             try:
@@ -807,6 +1051,10 @@ class DeleteQuery(BaseQuery):
                 deleted_count = 0
         
         return {"deleted_count": deleted_count}
+    
+    async def execute(self):
+        """Execute the DELETE query"""
+        return await self.db._run(self._build())
 
 
 class ColumnBuilder:
@@ -928,14 +1176,17 @@ class ColumnBuilder:
         self.create_table_query.constraints.append(f"CONSTRAINT {name} CHECK ({condition})")
         return self.create_table_query
     
-    async def execute(self):
-        """Execute the CREATE TABLE query"""
+    def _build(self) -> BuiltQuery:
+        """Build the CREATE TABLE query"""
         # Finalize current column first
         column_def = self._build_column_definition()
         self.create_table_query.columns.append(column_def)
         
-        # Execute the query
-        return await self.create_table_query.execute()
+        return self.create_table_query._build()
+    
+    async def execute(self):
+        """Execute the CREATE TABLE query"""
+        return await self.create_table_query.db_manager._run(self._build())
 
 
 class CreateTableQuery:
@@ -1006,8 +1257,8 @@ class CreateTableQuery:
         self.constraints.append(f"CONSTRAINT {name} CHECK ({condition})")
         return self
         
-    async def execute(self):
-        """Execute the CREATE TABLE query"""
+    def _build(self) -> BuiltQuery:
+        """Build the CREATE TABLE query"""
         if not self.columns:
             raise ValueError("At least one column is required")
             
@@ -1022,9 +1273,12 @@ class CreateTableQuery:
         sql += ", ".join(all_definitions)
         sql += ")"
         
-        # Execute the query (DDL statement - no fetch_results needed)
-        await self.db_manager._execute_query(self.table_name, sql, [], fetch_results=False)
-        return True
+        # DDL statement - no fetch_results needed
+        return BuiltQuery(self.table_name, sql, fetch_results=False, result=lambda _: True)
+    
+    async def execute(self):
+        """Execute the CREATE TABLE query"""
+        return await self.db_manager._run(self._build())
 
 
 class DropTableQuery:
@@ -1046,15 +1300,18 @@ class DropTableQuery:
         self.cascade = True
         return self
         
-    async def execute(self):
-        """Execute the DROP TABLE query"""
+    def _build(self) -> BuiltQuery:
+        """Build the DROP TABLE query"""
         exists_clause = "IF EXISTS " if self.if_exists else ""
         cascade_clause = " CASCADE" if self.cascade else ""
         
         sql = f"DROP TABLE {exists_clause}{self.table_name}{cascade_clause}"
         
-        await self.db_manager._execute_query(self.table_name, sql, [], fetch_results=False)
-        return True
+        return BuiltQuery(self.table_name, sql, fetch_results=False, result=lambda _: True)
+    
+    async def execute(self):
+        """Execute the DROP TABLE query"""
+        return await self.db_manager._run(self._build())
 
 
 class TruncateTableQuery:
@@ -1076,8 +1333,8 @@ class TruncateTableQuery:
         self.cascade = True
         return self
         
-    async def execute(self):
-        """Execute the TRUNCATE TABLE query"""
+    def _build(self) -> BuiltQuery:
+        """Build the TRUNCATE TABLE query"""
         sql = f"TRUNCATE TABLE {self.table_name}"
         
         if self.restart_identity:
@@ -1085,8 +1342,11 @@ class TruncateTableQuery:
         if self.cascade:
             sql += " CASCADE"
             
-        await self.db_manager._execute_query(self.table_name, sql, [], fetch_results=False)
-        return True
+        return BuiltQuery(self.table_name, sql, fetch_results=False, result=lambda _: True)
+    
+    async def execute(self):
+        """Execute the TRUNCATE TABLE query"""
+        return await self.db_manager._run(self._build())
 
 
 class ColumnAlteration:
@@ -1208,17 +1468,35 @@ class AlterTableQuery:
         self.operations.append(f"DROP CONSTRAINT {name}{cascade_clause}")
         return self
         
-    async def execute(self):
-        """Execute the ALTER TABLE query"""
+    def _build(self) -> BuiltQuery:
+        """Build the ALTER TABLE query"""
         if not self.operations:
             raise ValueError("At least one operation is required")
-            
-        # Execute each operation separately for better error handling
-        for operation in self.operations:
-            sql = f"ALTER TABLE {self.table_name} {operation}"
-            await self.db_manager._execute_query(self.table_name, sql, [], fetch_results=False)
-            
-        return True
+        
+        # One statement per operation (RENAME can't share an ALTER TABLE with other actions),
+        # sent together: a parameterless multi-statement query runs in one round trip and
+        # PostgreSQL applies it atomically, so a failing operation leaves the table untouched
+        sql = "; ".join(f"ALTER TABLE {self.table_name} {operation}" for operation in self.operations)
+        return BuiltQuery(self.table_name, sql, fetch_results=False, result=lambda _: True)
+    
+    async def execute(self):
+        """Execute the ALTER TABLE query"""
+        return await self.db_manager._run(self._build())
+
+
+class PooledConnection(asyncpg.Connection):
+    """Pool connection that remembers when it was last used, for health checks"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_used = time.monotonic()
+    
+    def mark_used(self):
+        self._last_used = time.monotonic()
+    
+    def idle_time(self) -> float:
+        """Seconds since the connection was opened or last released"""
+        return time.monotonic() - self._last_used
 
 
 class DatabaseManager:
@@ -1228,12 +1506,45 @@ class DatabaseManager:
     Handles database connections internally
     """
     
-    def __init__(self, credentials_path: str = "credentials.txt"):
-        """Initialize with credentials file path"""
+    def __init__(self, credentials_path: str = "credentials.txt", pool: bool = False,
+                 min_size: int = 1, max_size: int = 10, acquire_timeout: float = 30.0,
+                 health_check_interval: float = 60.0, max_inactive_connection_lifetime: float = 300.0,
+                 statement_cache_size: int = 256):
+        """
+        Initialize with credentials file path
+        
+        Args:
+            credentials_path: Credentials file under credentials/
+            pool: Use an asyncpg connection pool instead of a single connection, so
+                concurrent queries run on separate connections
+            min_size: Connections the pool opens up front and keeps open
+            max_size: Most connections the pool opens
+            acquire_timeout: Seconds to wait for a free pool connection before raising
+            health_check_interval: Pool connections idle for longer than this are pinged
+                before use and replaced if the ping fails (0 pings on every acquire)
+            max_inactive_connection_lifetime: Seconds after which idle pool connections are closed
+            statement_cache_size: Prepared statements each connection keeps, keyed by SQL text
+                (the query builders emit identical text for queries of the same shape). Set to 0
+                behind a transaction-pooling proxy that can't keep prepared statements
+        """
         self.credentials_file = credentials_path
         self.credentials_path = Path(__file__).parent / "credentials" / credentials_path
         self.credentials: Dict[str, str] = {}
+        self.use_pool = pool
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.max_inactive_connection_lifetime = max_inactive_connection_lifetime
+        self.statement_cache_size = statement_cache_size
         self._connection: Optional[asyncpg.Connection] = None
+        self._pool: Optional[asyncpg.Pool] = None
+        # A single connection runs one query at a time
+        self._connection_lock = asyncio.Lock()
+        # Connection of the transaction the current task is in, if any
+        self._transaction_connection: contextvars.ContextVar = contextvars.ContextVar(
+            f"transaction_connection_{id(self)}", default=None
+        )
         self._is_connected = False
         
         logger.info(f"DatabaseManager initialized for {credentials_path}")
@@ -1290,37 +1601,60 @@ class DatabaseManager:
             logger.error(f"Failed to parse database URL: {db_url}")
             raise ValueError(f"Invalid database URL format: {e}")
 
+    def _connection_url(self) -> str:
+        """Build the PostgreSQL connection string from the loaded credentials"""
+        # Use DATABASE_URL_POSTGRES if available (preferred)
+        postgres_url = self.credentials.get('DATABASE_URL_POSTGRES')
+        if postgres_url:
+            logger.info("Using direct PostgreSQL connection string")
+            return postgres_url
+        
+        # Fallback to building connection from components
+        db_url = self.credentials.get('DATABASE_URL')
+        api_key = self.credentials.get('XATA_API_KEY')
+        
+        if not db_url or not api_key:
+            raise ValueError("Missing required credentials: need either DATABASE_URL_POSTGRES or (DATABASE_URL + XATA_API_KEY)")
+        
+        # Parse database URL and build PostgreSQL connection string
+        conn_params = self._parse_database_url(db_url)
+        logger.info("Using constructed PostgreSQL connection string from Xata URL")
+        return (
+            f"postgresql://{conn_params['user']}:{api_key}@"
+            f"{conn_params['host']}:{conn_params['port']}/"
+            f"{conn_params['database']}?sslmode=require"
+        )
+
     async def _create_connection(self) -> asyncpg.Connection:
         """Create a new connection to the database"""
         try:
-            # Use DATABASE_URL_POSTGRES if available (preferred)
-            postgres_url = self.credentials.get('DATABASE_URL_POSTGRES')
-            if postgres_url:
-                logger.info("Using direct PostgreSQL connection string")
-                return await asyncpg.connect(postgres_url)
-            
-            # Fallback to building connection from components
-            db_url = self.credentials.get('DATABASE_URL')
-            api_key = self.credentials.get('XATA_API_KEY')
-            
-            if not db_url or not api_key:
-                raise ValueError("Missing required credentials: need either DATABASE_URL_POSTGRES or (DATABASE_URL + XATA_API_KEY)")
-            
-            # Parse database URL and build PostgreSQL connection string
-            conn_params = self._parse_database_url(db_url)
-            postgres_url = (
-                f"postgresql://{conn_params['user']}:{api_key}@"
-                f"{conn_params['host']}:{conn_params['port']}/"
-                f"{conn_params['database']}?sslmode=require"
-            )
-            
-            logger.info("Using constructed PostgreSQL connection string from Xata URL")
-            return await asyncpg.connect(postgres_url)
-            
+            return await asyncpg.connect(self._connection_url(), statement_cache_size=self.statement_cache_size)
         except Exception as e:
             logger.error(f"Failed to create database connection: {e}")
             raise
 
+    async def _create_pool(self) -> asyncpg.Pool:
+        """Create a connection pool for the database"""
+        try:
+            return await asyncpg.create_pool(
+                self._connection_url(),
+                min_size=self.min_size,
+                max_size=self.max_size,
+                max_inactive_connection_lifetime=self.max_inactive_connection_lifetime,
+                statement_cache_size=self.statement_cache_size,
+                connection_class=PooledConnection,
+                setup=self._check_connection
+            )
+        except Exception as e:
+            logger.error(f"Failed to create database connection pool: {e}")
+            raise
+
+    async def _check_connection(self, conn):
+        """Pool setup hook: ping a connection that sat idle past health_check_interval"""
+        # On failure asyncpg closes the connection and acquire() raises
+        if conn.idle_time() >= self.health_check_interval:
+            await conn.fetchval("SELECT 1", timeout=self.acquire_timeout)
+
     async def connect(self):
         """Connect to the database"""
         try:
@@ -1329,20 +1663,27 @@ class DatabaseManager:
                 return
                 
             self._load_credentials()
-            self._connection = await self._create_connection()
+            if self.use_pool:
+                self._pool = await self._create_pool()
+            else:
+                self._connection = await self._create_connection()
             self._is_connected = True
             logger.info(f"Successfully connected to database: {self.credentials_file}")
             
         except Exception as e:
             logger.error(f"Failed to connect to database {self.credentials_file}: {e}")
             self._connection = None
+            self._pool = None
             self._is_connected = False
             raise
 
     async def disconnect(self):
         """Disconnect from the database"""
         try:
-            if self._connection and not self._connection.is_closed():
+            if self._pool and not self._pool.is_closing():
+                await self._pool.close()
+                logger.info(f"Successfully disconnected from database: {self.credentials_file}")
+            elif self._connection and not self._connection.is_closed():
                 await self._connection.close()
                 logger.info(f"Successfully disconnected from database: {self.credentials_file}")
             else:
@@ -1352,23 +1693,51 @@ class DatabaseManager:
         finally:
             # Always reset connection state
             self._connection = None
+            self._pool = None
             self._is_connected = False
 
     @asynccontextmanager
     async def _get_connection(self):
-        """Get the database connection (internal use)"""
+        """Get a database connection for one query (internal use)"""
         if not self._is_connected:
             raise RuntimeError("Not connected to database. Call connect() first.")
         
+        # Inside transaction() every query runs on the transaction's connection
+        transaction_connection = self._transaction_connection.get()
+        if transaction_connection is not None:
+            yield transaction_connection
+            return
+        
+        if self._pool is not None:
+            conn = await self._acquire()
+            try:
+                yield conn
+            finally:
+                conn.mark_used()
+                await self._pool.release(conn)
+            return
+        
         if not self._connection or self._connection.is_closed():
             raise RuntimeError("Connection is closed or invalid")
-            
-        yield self._connection
+        
+        async with self._connection_lock:
+            yield self._connection
+
+    async def _acquire(self):
+        """Acquire a pool connection, retrying once if the one handed out fails its health check"""
+        try:
+            return await self._pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            # No connection freed up in time (TimeoutError is an OSError on 3.11+)
+            raise
+        except (OSError, asyncpg.InterfaceError, asyncpg.PostgresConnectionError) as e:
+            # asyncpg has closed the broken connection; the retry opens a fresh one
+            logger.warning(f"Pool connection failed its health check, reconnecting: {e}")
+            return await self._pool.acquire(timeout=self.acquire_timeout)
 
     async def _execute_query(self, table_name: str, sql: str, params: List[Any] = None, fetch_results: bool = True) -> Union[List[Dict[str, Any]], str]:
-        """Execute a query using internal database connection"""
+        """Execute a query, acquiring a connection for just this query (from the pool in pool mode)"""
         try:
-            # Use internal connection
             async with self._get_connection() as conn:
                 if fetch_results:
                     # For SELECT, INSERT...RETURNING, UPDATE...RETURNING queries
@@ -1387,6 +1756,83 @@ class DatabaseManager:
             raise
 
 
+    async def _run(self, query: Union[BuiltQuery, List[BuiltQuery]]) -> Any:
+        """Execute a built query and shape its result"""
+        if isinstance(query, list):
+            # A bulk insert split into several statements: all or nothing, rows concatenated
+            async with self.transaction():
+                results = [await self._run(part) for part in query]
+            return [row for result in results for row in result]
+        
+        result = await self._execute_query(query.table_name, query.sql, query.params, fetch_results=query.fetch_results)
+        return query.shape(result)
+
+    async def _copy_records(self, table_name: str, columns: List[str], records: List[tuple]) -> int:
+        """COPY records into a table using internal database connection"""
+        schema_name, _, table = table_name.rpartition(".")
+        try:
+            async with self._get_connection() as conn:
+                result = await conn.copy_records_to_table(
+                    table, records=records, columns=columns, schema_name=schema_name or None
+                )
+        except Exception as e:
+            logger.error(f"Error copying {len(records)} records into {table_name}: {e}")
+            raise
+        
+        # Command tag, e.g. "COPY 5000"
+        return int(result.split()[-1])
+
+    @asynccontextmanager
+    async def transaction(self, isolation: Optional[str] = None, readonly: bool = False):
+        """
+        Run the queries executed inside the block in one transaction
+        
+        The transaction's connection is pinned for the current task, so every
+        execute() inside the block uses it and the block commits once (or rolls
+        back if it raises). Nested blocks become savepoints. Don't run queries
+        from several concurrent tasks inside one block: a connection runs one
+        query at a time.
+        
+        Args:
+            isolation: 'read_committed' (default), 'repeatable_read' or 'serializable'
+            readonly: Start a read-only transaction
+        
+        Usage:
+            async with db.transaction():
+                person = await db.insert.into("people").values(person_row).execute()
+                await db.insert.into("email_campaigns").values(campaign_rows).execute()
+        """
+        transaction_connection = self._transaction_connection.get()
+        if transaction_connection is not None:
+            async with transaction_connection.transaction():
+                yield self
+            return
+        
+        async with self._get_connection() as conn:
+            async with conn.transaction(isolation=isolation, readonly=readonly):
+                token = self._transaction_connection.set(conn)
+                try:
+                    yield self
+                finally:
+                    self._transaction_connection.reset(token)
+
+    async def batch(self, *queries) -> List[Any]:
+        """
+        Execute several queries on one connection in a single transaction
+        
+        Every query is built before the transaction starts, so a malformed query
+        fails without touching the database.
+        
+        Args:
+            *queries: Unexecuted query builders (select, insert, update, delete, DDL)
+            
+        Returns:
+            Each query's execute() result, in order
+        """
+        built = [query._build() for query in queries]
+        async with self.transaction():
+            return [await self._run(query) for query in built]
+
     @property
     def select(self):
         """Start a SELECT query"""
@@ -1464,3 +1910,40 @@ class UtilityFunctions:
         except Exception as e:
             logger.error(f"Error listing tables in schema '{schema}': {e}")
             raise
+    
+    async def paginate(self, table: str, limit: int, after: Any = None,
+                       key: str = "id", fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch one keyset-paginated page from a table
+        
+        Args:
+            table: Table name
+            limit: Maximum number of rows in the page
+            after: Cursor returned by the previous page (None for the first page)
+            key: Unique, indexed column to paginate on (default: 'id')
+            fields: Columns to select (default: all)
+            
+        Returns:
+            Dict with 'data' (list of rows) and 'next_cursor' (None on the last page)
+        """
+        try:
+            # The cursor column must be selected to build next_cursor
+            columns = list(fields or [])
+            if columns and key not in columns:
+                columns.append(key)
+            
+            # Fetch one extra row to learn whether another page exists
+            rows = await (self.db_manager
+                .select(*columns)
+                .from_(table)
+                .keyset(key, after, limit + 1)
+                .execute()
+            )
+            
+            page = rows[:limit]
+            next_cursor = page[-1][key] if len(rows) > limit else None
+            return {"data": page, "next_cursor": next_cursor}
+            
+        except Exception as e:
+            logger.error(f"Error paginating table '{table}': {e}")
+            raise
@@ -0,0 +1,79 @@
+"""
+Offline location to IANA timezone resolver.
+
+Looks places up in the bundled data/gazetteer.json (cities and states/provinces
+of countries that span several timezones), then falls back to the country's
+zone when pytz lists a single one for it, or to the gazetteer's default zone
+for the country. Returns None when the location can't be resolved offline, so
+callers can fall back to network geocoding.
+"""
+
+import os
+import threading
+import unicodedata
+from typing import Dict, Optional
+
+import pytz
+
+from .codec import codec
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), "data", "gazetteer.json")
+
+
+def normalize_place(name: str) -> str:
+    """Lookup key for a place name: lowercase ASCII with single spaces."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return " ".join(ascii_name.lower().split())
+
+
+class Gazetteer:
+    """Offline (city, state, country) -> timezone lookups backed by a bundled JSON index."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Gazetteer JSON file (default: data/gazetteer.json next to this module).
+                It is read once, on the first lookup.
+        """
+        self.path = path or GAZETTEER_PATH
+        self._data: Optional[Dict[str, Dict]] = None
+        self._lock = threading.Lock()
+
+    def _index(self) -> Dict[str, Dict]:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    with open(self.path, "rb") as f:
+                        self._data = codec.loads(f.read())
+        return self._data
+
+    def resolve(self, country_code: str, city: Optional[str] = None, state: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve a location to an IANA timezone name without network access.
+
+        The city is looked up among the country's cities and the state among its
+        regions. Cities are never matched against regions: their keys include
+        state codes, and city="LA" or "Washington" would land in Louisiana or
+        Washington state.
+
+        Returns:
+            Timezone name, or None if the gazetteer can't tell.
+        """
+        country_code = country_code.upper()
+        index = self._index()
+        cities = index["cities"].get(country_code, {})
+        regions = index["regions"].get(country_code, {})
+
+        for place, places in ((city, cities), (state, regions)):
+            if place and place.strip():
+                timezone_name = places.get(normalize_place(place))
+                if timezone_name:
+                    return timezone_name
+
+        try:
+            zones = pytz.country_timezones[country_code]
+        except KeyError:
+            return None
+        if len(zones) == 1:
+            return zones[0]
+        return index["defaults"].get(country_code)
@@ -1,9 +1,75 @@
-import requests
-import pycountry
-import pandas as pd
+import os
+import asyncio
+import threading
 import time
-from tqdm import tqdm
-from typing import Union, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Union, List, Dict, Any, Optional
+
+from .cache import MISSING, TieredCache
+
+# requests, pycountry, pandas and tqdm are imported where they are used:
+# together they add about half a second to importing this module
+if TYPE_CHECKING:
+    import pandas as pd
+    import requests
+
+
+DEFAULT_HOLIDAYS_API_URL = "https://api.11holidays.com/v1/holidays"
+DEFAULT_HOLIDAYS_CACHE_PATH = os.path.join(os.path.dirname(__file__), "database", "data", "holidays_cache.sqlite3")
+# Holiday calendars for a year rarely change; refetch weekly
+DEFAULT_HOLIDAYS_CACHE_TTL = 7 * 24 * 3600
+
+
+@dataclass(frozen=True, slots=True)
+class HolidayRecord:
+    """A processed holiday with its date already parsed."""
+    country: str
+    name: str
+    date: date
+    type: str
+
+    def to_dict(self) -> Dict[str, str]:
+        """Plain dict with the date as a YYYY-MM-DD string (the DataFrame/JSON row format)."""
+        return {"country": self.country, "name": self.name, "date": self.date.isoformat(), "type": self.type}
+
+
+def parse_holiday_date(value: Any) -> Optional[date]:
+    """Parse an API date string (YYYY-MM-DD, optionally followed by a time part)."""
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    Allows `rate` acquisitions per second on average, with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
 
 
 class Holidays:
@@ -12,8 +78,36 @@ class Holidays:
     Uses the 11holidays API to retrieve holiday information.
     """
     
-    def __init__(self):
-        """Initialize the Holidays class with configuration data."""
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None,
+                 max_workers: int = 8, rate_limit: Optional[float] = None,
+                 cache_path: Optional[str] = None, cache_ttl: Optional[float] = None):
+        """
+        Initialize the Holidays class with configuration data.
+
+        Args:
+            base_url (str): Holidays API endpoint (default: HOLIDAYS_API_URL env var or the 11holidays API).
+            timeout (float): Per-request timeout in seconds (default: REQUEST_TIMEOUT env var or 10).
+            max_workers (int): Maximum number of concurrent API requests.
+            rate_limit (float): Maximum API requests per second across all workers
+                (default: HOLIDAYS_RATE_LIMIT env var or 20).
+            cache_path (str): SQLite file caching API responses per (country code, year)
+                (default: HOLIDAYS_CACHE_PATH env var or database/data/holidays_cache.sqlite3).
+            cache_ttl (float): Seconds before a cached country/year is refetched
+                (default: HOLIDAYS_CACHE_TTL env var or one week). 0 disables caching.
+        """
+        self.base_url = base_url or os.getenv("HOLIDAYS_API_URL", DEFAULT_HOLIDAYS_API_URL)
+        self.timeout = timeout if timeout is not None else float(os.getenv("REQUEST_TIMEOUT", "10"))
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit if rate_limit is not None else float(os.getenv("HOLIDAYS_RATE_LIMIT", "20"))
+
+        # One HTTP session per worker thread so connections are reused
+        self._local = threading.local()
+
+        # API responses per (country code, year): in-process LRU over a SQLite file
+        if cache_ttl is None:
+            cache_ttl = float(os.getenv("HOLIDAYS_CACHE_TTL", DEFAULT_HOLIDAYS_CACHE_TTL))
+        cache_path = cache_path or os.getenv("HOLIDAYS_CACHE_PATH", DEFAULT_HOLIDAYS_CACHE_PATH)
+        self.cache = TieredCache(cache_path, ttl=cache_ttl, maxsize=1024, table="holidays") if cache_ttl > 0 else None
         
         # Mapping for common country name variants to ISO official names
         self.country_name_mappings = {
@@ -142,6 +236,7 @@ class Holidays:
             "Muslim, Common Local Holiday",
             "National Holiday, Hinduism"
         ]
+        self._accepted_types = frozenset(self.accepted_holiday_types)
 
         # Global mandate holidays (name, (month, day))
         self.global_mandate_holidays = [
@@ -156,19 +251,70 @@ class Holidays:
     @staticmethod
     def get_country_name_from_code(code: str) -> str:
         """Convert ISO alpha-2 code to full country name."""
+        import pycountry
         try:
             return pycountry.countries.get(alpha_2=code).name
         except:
             return code  # fallback
 
+    def _session(self) -> "requests.Session":
+        """Get the HTTP session of the current thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            session = requests.Session()
+            self._local.session = session
+        return session
+
     @staticmethod
-    def fetch_holidays_for_country(country_code: str, year: int) -> List[Dict[str, Any]]:
-        """Fetch holiday data from 11holidays API for a specific country."""
-        url = f"https://api.11holidays.com/v1/holidays?country={country_code}&year={year}"
+    def _cache_key(country_code: str, year: int) -> str:
+        return f"{country_code}:{year}"
+
+    def get_cached_holidays(self, country_code: str, year: int) -> Optional[List[Dict[str, Any]]]:
+        """Get the cached API response for a country and year, or None if not cached or expired."""
+        if self.cache is None:
+            return None
+        holidays = self.cache.get(self._cache_key(country_code, year))
+        return None if holidays is MISSING else holidays
+
+    def clear_cache(self, country_code: Optional[str] = None, year: Optional[int] = None):
+        """Drop one cached country/year, or the whole cache when no country is given."""
+        if self.cache is None:
+            return
+        if country_code is None:
+            self.cache.clear()
+        else:
+            self.cache.delete(self._cache_key(country_code, year))
+
+    def fetch_holidays_for_country(self, country_code: str, year: int, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get holiday data for a specific country, from the cache when possible.
+
+        Successful API responses are cached per (country code, year); failures are not.
+        Pass refresh=True to bypass the cache and refetch.
+        """
+        if not refresh:
+            holidays = self.get_cached_holidays(country_code, year)
+            if holidays is not None:
+                return holidays
+
+        holidays = self._request_holidays(country_code, year)
+        if holidays is None:
+            return []
+        if self.cache is not None:
+            self.cache.set(self._cache_key(country_code, year), holidays)
+        return holidays
+
+    def _request_holidays(self, country_code: str, year: int) -> Optional[List[Dict[str, Any]]]:
+        """Fetch holiday data from 11holidays API for a specific country (None on failure)."""
         try:
-            response = requests.get(url, timeout=10)
+            response = self._session().get(
+                self.base_url,
+                params={"country": country_code, "year": year},
+                timeout=self.timeout
+            )
             if response.status_code != 200:
-                return []
+                return None
             holidays = response.json()
             return [
                 {
@@ -180,30 +326,26 @@ class Holidays:
                 for entry in holidays
             ]
         except:
-            return []
+            return None
 
-    def fetch_holiday_data(self, year: int, countries: Union[str, List[str]] = "all", sleep_time: float = 0.1) -> pd.DataFrame:
+    def resolve_country_codes(self, countries: Union[str, List[str]] = "all") -> List[str]:
         """
-        Fetch holiday data for all or specific countries.
-
-        Args:
-            year (int): Year for which to fetch holidays.
-            countries (str or list): 'all', a single country name, or a list of country names.
-            sleep_time (float): Optional sleep between requests.
+        Convert 'all', a country name, or a list of country names into ISO alpha-2 codes.
 
-        Returns:
-            pd.DataFrame: Combined holiday data.
+        Raises:
+            ValueError: If a country name is not recognised.
+            TypeError: If countries is not a string or a list.
         """
-        all_data = []
+        import pycountry
 
         if countries == "all":
-            country_codes = [country.alpha_2 for country in pycountry.countries]
+            return [country.alpha_2 for country in pycountry.countries]
         elif isinstance(countries, str):
             iso_name = self.country_name_mappings.get(countries, countries)
             country_obj = pycountry.countries.get(name=iso_name)
             if not country_obj:
                 raise ValueError(f"Invalid country name: {countries}")
-            country_codes = [country_obj.alpha_2]
+            return [country_obj.alpha_2]
         elif isinstance(countries, list):
             country_codes = []
             for name in countries:
@@ -212,26 +354,99 @@ class Holidays:
                 if not country_obj:
                     raise ValueError(f"Invalid country name in list: {name}")
                 country_codes.append(country_obj.alpha_2)
+            return country_codes
         else:
             raise TypeError("countries must be 'all', a string, or a list of strings")
 
-        for code in tqdm(country_codes, desc="Fetching holiday data"):
-            holidays = self.fetch_holidays_for_country(code, year)
-            all_data.extend(holidays)
-            time.sleep(sleep_time)
+    def fetch_holiday_records(self, year: int, country_codes: List[str],
+                              sleep_time: Optional[float] = None, max_workers: Optional[int] = None,
+                              rate_limit: Optional[float] = None, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fetch raw holiday records (country as ISO code) for the given country codes.
+
+        Countries already in the cache are served locally. The rest are requested
+        concurrently on a thread pool, paced by a shared token bucket.
+
+        Args:
+            year (int): Year for which to fetch holidays.
+            country_codes (list): ISO alpha-2 country codes.
+            sleep_time (float): Legacy pacing; when given, limits requests to 1 / sleep_time per second.
+            max_workers (int): Maximum concurrent requests (default: the instance setting).
+            rate_limit (float): Maximum requests per second (default: derived from sleep_time,
+                else the instance setting). 0 disables rate limiting.
+            refresh (bool): Ignore cached responses and refetch every country.
 
-        df = pd.DataFrame(all_data)
+        Returns:
+            list: Holiday records in country_codes order.
+        """
+        results = {}
+        if not refresh:
+            for code in country_codes:
+                holidays = self.get_cached_holidays(code, year)
+                if holidays is not None:
+                    results[code] = holidays
+        missing_codes = [code for code in country_codes if code not in results]
+
+        if missing_codes:
+            if rate_limit is None:
+                rate_limit = 1 / sleep_time if sleep_time else self.rate_limit
+            bucket = TokenBucket(rate_limit) if rate_limit else None
+            workers = max(1, min(max_workers or self.max_workers, len(missing_codes)))
+
+            def fetch(code: str) -> List[Dict[str, Any]]:
+                if bucket:
+                    bucket.acquire()
+                return self.fetch_holidays_for_country(code, year, refresh=True)
+
+            from tqdm import tqdm
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="holidays-fetch") as executor:
+                fetched = executor.map(fetch, missing_codes)
+                for code, holidays in zip(missing_codes, tqdm(fetched, total=len(missing_codes), desc="Fetching holiday data")):
+                    results[code] = holidays
+
+        all_data = []
+        for code in country_codes:
+            all_data.extend(results[code])
+        return all_data
+
+    def records_to_frame(self, records: List[Dict[str, Any]]) -> "pd.DataFrame":
+        """Build a holidays DataFrame from raw records, replacing country codes with names."""
+        import pandas as pd
+
+        df = pd.DataFrame(records, columns=["country", "name", "date", "type"])
         if not df.empty:
             df["country"] = df["country"].apply(self.get_country_name_from_code)
         return df
 
-    def filter_by_type(self, df: pd.DataFrame, allowed_types: List[str] = None) -> pd.DataFrame:
+    def fetch_holiday_data(self, year: int, countries: Union[str, List[str]] = "all",
+                           sleep_time: Optional[float] = None, max_workers: Optional[int] = None,
+                           rate_limit: Optional[float] = None, refresh: bool = False) -> "pd.DataFrame":
+        """
+        Fetch holiday data for all or specific countries.
+
+        Args:
+            year (int): Year for which to fetch holidays.
+            countries (str or list): 'all', a single country name, or a list of country names.
+            sleep_time, max_workers, rate_limit, refresh: See fetch_holiday_records.
+
+        Returns:
+            pd.DataFrame: Combined holiday data.
+        """
+        country_codes = self.resolve_country_codes(countries)
+        records = self.fetch_holiday_records(
+            year, country_codes,
+            sleep_time=sleep_time, max_workers=max_workers, rate_limit=rate_limit, refresh=refresh
+        )
+        return self.records_to_frame(records)
+
+    def filter_by_type(self, df: "pd.DataFrame", allowed_types: List[str] = None) -> "pd.DataFrame":
         """Filter the holidays by allowed types only."""
         if allowed_types is None:
             allowed_types = self.accepted_holiday_types
         return df[df["type"].isin(allowed_types)].copy()
 
-    def append_mandate_holidays(self, df: pd.DataFrame, year: int) -> pd.DataFrame:
+    def append_mandate_holidays(self, df: "pd.DataFrame", year: int) -> "pd.DataFrame":
         """
         For each country present in the DataFrame, append known global mandate holidays
         like New Year's Day, Christmas, etc., with type='Mandate Holiday'.
@@ -250,10 +465,11 @@ class Holidays:
                 })
 
         if new_rows:
+            import pandas as pd
             df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
         return df
 
-    def deduplicate_holidays(self, df: pd.DataFrame) -> pd.DataFrame:
+    def deduplicate_holidays(self, df: "pd.DataFrame") -> "pd.DataFrame":
         """
         Deduplicate holiday data:
         1. Drop duplicates based on (country, name, date)
@@ -268,8 +484,77 @@ class Holidays:
         df = df.sort_values(by=["country", "date"]).reset_index(drop=True)
         return df
 
+    def process_records(self, records: List[Dict[str, Any]], year: int,
+                        include_mandate: bool = True) -> List[HolidayRecord]:
+        """
+        Filter raw records by accepted types, optionally add mandate holidays,
+        and deduplicate (one holiday per country and date), sorted by country and date.
+        Records whose date cannot be parsed are dropped.
+        """
+        accepted_types = self._accepted_types
+        country_names: Dict[str, str] = {}
+        holidays = []
+
+        for record in records:
+            if record.get("type") not in accepted_types:
+                continue
+            holiday_date = parse_holiday_date(record.get("date"))
+            if holiday_date is None:
+                continue
+            code = record["country"]
+            country = country_names.get(code)
+            if country is None:
+                country = country_names[code] = self.get_country_name_from_code(code)
+            holidays.append(HolidayRecord(country, record["name"], holiday_date, record["type"]))
+
+        if include_mandate:
+            for country in dict.fromkeys(holiday.country for holiday in holidays):
+                for name, (month, day) in self.global_mandate_holidays:
+                    holidays.append(HolidayRecord(country, name, date(year, month, day), "Mandate Holiday"))
+
+        # Keep the first holiday for each country-date
+        unique: Dict[tuple, HolidayRecord] = {}
+        for holiday in holidays:
+            unique.setdefault((holiday.country, holiday.date), holiday)
+        return sorted(unique.values(), key=lambda holiday: (holiday.country, holiday.date))
+
+    def get_holiday_records(self, year: int, countries: Union[str, List[str]] = "all",
+                            include_mandate: bool = True, sleep_time: Optional[float] = None,
+                            refresh: bool = False) -> List[HolidayRecord]:
+        """
+        Complete workflow to fetch, filter, and process holiday data, without pandas.
+
+        Args:
+            year (int): Year for which to fetch holidays.
+            countries (str or list): 'all', a single country name, or a list of country names.
+            include_mandate (bool): Whether to include mandate holidays.
+            sleep_time (float): Legacy pacing between API requests (see fetch_holiday_records).
+            refresh (bool): Ignore cached API responses and refetch.
+
+        Returns:
+            list: HolidayRecord items sorted by country and date.
+        """
+        country_codes = self.resolve_country_codes(countries)
+        records = self.fetch_holiday_records(year, country_codes, sleep_time=sleep_time, refresh=refresh)
+        return self.process_records(records, year, include_mandate)
+
+    async def get_holiday_records_async(self, year: int, countries: Union[str, List[str]] = "all",
+                                        include_mandate: bool = True, refresh: bool = False) -> List[HolidayRecord]:
+        """get_holiday_records for async callers; the blocking fetch runs in a worker thread."""
+        return await asyncio.to_thread(
+            self.get_holiday_records, year, countries=countries, include_mandate=include_mandate, refresh=refresh
+        )
+
+    @staticmethod
+    def to_frame(holidays: List[HolidayRecord]) -> "pd.DataFrame":
+        """DataFrame adapter for processed holidays (dates as YYYY-MM-DD strings)."""
+        import pandas as pd
+
+        return pd.DataFrame([holiday.to_dict() for holiday in holidays], columns=list(HolidayRecord.__slots__))
+
     def get_holidays(self, year: int, countries: Union[str, List[str]] = "all", 
-                     include_mandate: bool = True, sleep_time: float = 0.1) -> pd.DataFrame:
+                     include_mandate: bool = True, sleep_time: Optional[float] = None,
+                     refresh: bool = False) -> "pd.DataFrame":
         """
         Complete workflow to fetch, filter, and process holiday data.
         
@@ -277,25 +562,22 @@ class Holidays:
             year (int): Year for which to fetch holidays.
             countries (str or list): 'all', a single country name, or a list of country names.
             include_mandate (bool): Whether to include mandate holidays.
-            sleep_time (float): Sleep time between API requests.
+            sleep_time (float): Legacy pacing between API requests (see fetch_holiday_records).
+            refresh (bool): Ignore cached API responses and refetch.
             
         Returns:
             pd.DataFrame: Processed holiday data.
         """
-        # Fetch holiday data
-        df = self.fetch_holiday_data(year, countries=countries, sleep_time=sleep_time)
-        
-        # Filter by allowed types
-        df = self.filter_by_type(df, self.accepted_holiday_types)
-        
-        # Add mandate holidays if requested
-        if include_mandate:
-            df = self.append_mandate_holidays(df, year)
-        
-        # Deduplicate
-        df = self.deduplicate_holidays(df)
-        
-        return df
+        return self.to_frame(self.get_holiday_records(
+            year, countries=countries, include_mandate=include_mandate, sleep_time=sleep_time, refresh=refresh
+        ))
+
+    async def get_holidays_async(self, year: int, countries: Union[str, List[str]] = "all",
+                                 include_mandate: bool = True, refresh: bool = False) -> "pd.DataFrame":
+        """get_holidays for async callers."""
+        return self.to_frame(await self.get_holiday_records_async(
+            year, countries=countries, include_mandate=include_mandate, refresh=refresh
+        ))
 
 
 # Example usage function
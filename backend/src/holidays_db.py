@@ -0,0 +1,245 @@
+"""
+Holidays persisted in the Xata `holidays` table.
+
+HolidaySync fetches holidays from the external API and bulk-writes them into
+the table; DatabaseHolidays answers get_holidays / get_holiday_records (and
+so the scheduler) from the table so API workers don't wait on the external
+API at request time.
+
+Sync from the command line (from backend/):
+    python -m src.holidays_db --year 2025 [--countries "Japan,India"] [--refresh]
+"""
+
+import asyncio
+import argparse
+import concurrent.futures
+import logging
+import os
+import threading
+from datetime import date
+from typing import Union, List, Dict, Any, Optional
+
+from .holidays import Holidays, HolidayRecord, parse_holiday_date
+from .database.xata import DatabaseManager, TABLE_SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+HOLIDAYS_TABLE = "holidays"
+
+
+class HolidaySync:
+    """Fetches holidays from the API and writes them into the holidays table."""
+
+    def __init__(self, db: DatabaseManager, holidays: Optional[Holidays] = None):
+        """
+        Args:
+            db: Connected DatabaseManager.
+            holidays: Holidays client used to fetch from the API (default: a new one).
+        """
+        self.db = db
+        self.holidays = holidays or Holidays()
+
+    @staticmethod
+    def _to_rows(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert raw API records into holidays table rows, dropping undated and duplicate entries."""
+        rows = {}
+        for record in records:
+            holiday_date = parse_holiday_date(record.get("date"))
+            if holiday_date is None:
+                continue
+            key = (record["country"], holiday_date, record["name"])
+            rows.setdefault(key, {
+                "country": record["country"],
+                "name": record["name"],
+                "date": holiday_date,
+                "holiday_type": record.get("type"),
+            })
+        return list(rows.values())
+
+    async def sync_codes(self, year: int, country_codes: List[str], refresh: bool = False) -> int:
+        """
+        Fetch holidays for the given ISO country codes and upsert them into the table.
+
+        Returns:
+            int: Number of rows inserted or changed.
+        """
+        records = await asyncio.to_thread(self.holidays.fetch_holiday_records, year, country_codes, refresh=refresh)
+        rows = self._to_rows(records)
+
+        # One upsert (split into statements under the parameter limit that commit together,
+        # so a failed sync leaves no partial year behind). Existing holidays only get their
+        # type refreshed, and only rows that were inserted or actually changed come back
+        written = 0
+        if rows:
+            result = await (self.db
+                .insert
+                .into(HOLIDAYS_TABLE)
+                .values(rows)
+                .on_conflict("country", "date", "name").do_update(
+                    only_if_changed=True, timestamp_column="updated_at"
+                )
+                .execute()
+            )
+            written = len(result)
+
+        logger.info(f"Synced holidays for {len(country_codes)} countries in {year}: "
+                    f"{len(rows)} fetched, {written} new or changed")
+        return written
+
+    async def sync(self, year: int, countries: Union[str, List[str]] = "all", refresh: bool = False) -> int:
+        """
+        Fetch holidays for 'all', a country name, or a list of country names and upsert them into the table.
+
+        Returns:
+            int: Number of rows inserted or changed.
+        """
+        country_codes = self.holidays.resolve_country_codes(countries)
+        return await self.sync_codes(year, country_codes, refresh=refresh)
+
+
+class DatabaseHolidays(Holidays):
+    """
+    Holidays backend that reads from the holidays table.
+
+    Countries with no rows for the requested year fall back to the API (and its
+    local cache) unless fallback_to_api is False.
+
+    The database is used from a private event loop on its own thread. The sync
+    lookups the scheduler makes from worker threads and the async ones made
+    from the app's loop both run their queries there, so one pool serves both.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None, fallback_to_api: bool = True, **kwargs):
+        """
+        Args:
+            db: DatabaseManager to read from (default: a pooled one using HOLIDAYS_DB_CREDENTIALS
+                or credentials.txt, so concurrent API requests don't queue on one connection).
+                It is connected on first use, on this object's database loop.
+            fallback_to_api: Fetch countries missing from the table from the API.
+            **kwargs: Passed through to Holidays.
+        """
+        super().__init__(**kwargs)
+        self.db = db or DatabaseManager(
+            credentials_path=os.getenv("HOLIDAYS_DB_CREDENTIALS", "credentials.txt"), pool=True
+        )
+        self.fallback_to_api = fallback_to_api
+        self._connect_lock = asyncio.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    def _db_loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop the database is used from, started on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="holidays-db", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def _run_on_db_loop(self, coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the database loop."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._db_loop())
+
+    async def _ensure_connected(self):
+        if self.db._is_connected:
+            return
+        async with self._connect_lock:
+            if not self.db._is_connected:
+                await self.db.connect()
+
+    async def close(self):
+        """Disconnect from the database and stop the database loop."""
+        if self._loop is None:
+            return
+        if self.db._is_connected:
+            await asyncio.wrap_future(self._run_on_db_loop(self.db.disconnect()))
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        await asyncio.to_thread(self._loop_thread.join)
+        self._loop.close()
+        self._loop = None
+        self._loop_thread = None
+
+    async def _select_holiday_records(self, year: int, country_codes: List[str],
+                                      refresh: bool = False) -> List[Dict[str, Any]]:
+        """Read raw holiday records from the table, re-syncing them from the API first on refresh."""
+        await self._ensure_connected()
+        if refresh:
+            await HolidaySync(self.db, self).sync_codes(year, country_codes, refresh=True)
+        if not country_codes:
+            return []
+
+        # (country, date) is the leading prefix of the UNIQUE (country, date, name) index,
+        # so this is an index range scan
+        rows = await (self.db
+            .select("country", "name", "date", "holiday_type")
+            .from_(HOLIDAYS_TABLE)
+            .where("country").in_(country_codes)
+            .and_where("date").between(date(year, 1, 1), date(year, 12, 31))
+            .order_by("country")
+            .order_by("date")
+            .order_by("id")
+            .execute()
+        )
+        return [
+            {
+                "country": row["country"],
+                "name": row["name"],
+                "date": row["date"].isoformat(),
+                "type": row["holiday_type"]
+            }
+            for row in rows
+        ]
+
+    def fetch_holiday_records_from_db(self, year: int, country_codes: List[str],
+                                      refresh: bool = False) -> List[Dict[str, Any]]:
+        """Read raw holiday records for the given ISO country codes and year from the table (blocking)."""
+        return self._run_on_db_loop(self._select_holiday_records(year, country_codes, refresh)).result()
+
+    def get_holiday_records(self, year: int, countries: Union[str, List[str]] = "all",
+                            include_mandate: bool = True, sleep_time: Optional[float] = None,
+                            refresh: bool = False) -> List[HolidayRecord]:
+        """
+        Get processed holidays from the table.
+
+        With refresh=True the requested countries are first re-synced from the API.
+        get_holidays and get_holiday_records_async (a worker thread) both read through here.
+        """
+        country_codes = self.resolve_country_codes(countries)
+        records = self.fetch_holiday_records_from_db(year, country_codes, refresh=refresh)
+
+        if self.fallback_to_api:
+            found_codes = {record["country"] for record in records}
+            missing_codes = [code for code in country_codes if code not in found_codes]
+            if missing_codes:
+                records += self.fetch_holiday_records(year, missing_codes, sleep_time=sleep_time)
+
+        return self.process_records(records, year, include_mandate)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sync holidays from the holidays API into the database")
+    parser.add_argument("--year", type=int, required=True, help="year to sync")
+    parser.add_argument("--countries", default="all", help="'all' or a comma-separated list of country names")
+    parser.add_argument("--credentials", default=os.getenv("HOLIDAYS_DB_CREDENTIALS", "credentials.txt"),
+                        help="credentials file under database/xata/credentials")
+    parser.add_argument("--refresh", action="store_true", help="ignore the local API cache")
+    args = parser.parse_args()
+
+    countries = "all" if args.countries == "all" else [country.strip() for country in args.countries.split(",")]
+
+    db = DatabaseManager(credentials_path=args.credentials)
+    await db.connect()
+    try:
+        await db._execute_query(HOLIDAYS_TABLE, TABLE_SCHEMAS[HOLIDAYS_TABLE], fetch_results=False)
+        written = await HolidaySync(db).sync(args.year, countries, refresh=args.refresh)
+        print(f"Wrote {written} new or changed holidays for {args.year}")
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -1,22 +1,39 @@
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Union, List, Optional
 from pydantic import BaseModel, ValidationError
-import uvicorn
+import asyncio
+import os
+import threading
 
 from .models import (
     CompanyCreate, CompanyUpdate, Company,
     PersonCreate, Person,
     EmailStatCreate, EmailStat,
+    CompanyPage, PersonPage, EmailStatPage,
     StatsResponse,
     ProfileUpdate, Profile,
     ClientConnectionsUpdate, ClientConnections,
     NotificationSettingsUpdate, NotificationSettings,
     EmailDataUpdate, EmailData
 )
+from .codec import codec
 from .database.storage import storage
-from .holidays import Holidays
-from .scheduler import Scheduler
+
+class CodecJSONResponse(JSONResponse):
+    """
+    JSON response rendered with the shared codec (orjson when installed).
+    
+    Returned directly by routes that build large plain-dict payloads, which skips
+    jsonable_encoder entirely. It is deliberately not the app's default class:
+    routes with a response_model serialize straight through pydantic-core only
+    while the default class is left alone.
+    """
+    
+    def render(self, content) -> bytes:
+        return codec.dumps(content)
+
 
 app = FastAPI(
     title="Mountain Backend API",
@@ -33,9 +50,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-holidays_service = Holidays()
-scheduler_service = Scheduler()
+# Largest page size accepted by the keyset-paginated list endpoints
+MAX_PAGE_SIZE = 1000
+
+# Services are created on first use: importing them pulls in pandas, geopy,
+# timezonefinder and friends, which would slow every worker's cold start
+_holidays_service = None
+_scheduler_service = None
+_services_lock = threading.Lock()
+
+
+def get_holidays_service():
+    """Get the holidays service, creating it on first use."""
+    global _holidays_service
+    if _holidays_service is None:
+        with _services_lock:
+            if _holidays_service is None:
+                # HOLIDAYS_BACKEND=database answers holiday lookups from the Xata holidays table
+                if os.getenv("HOLIDAYS_BACKEND", "api").lower() == "database":
+                    from .holidays_db import DatabaseHolidays
+                    _holidays_service = DatabaseHolidays()
+                else:
+                    from .holidays import Holidays
+                    _holidays_service = Holidays()
+    return _holidays_service
+
+
+def get_scheduler_service():
+    """Get the scheduler service (sharing the holidays service), creating it on first use."""
+    global _scheduler_service
+    if _scheduler_service is None:
+        holidays_service = get_holidays_service()
+        with _services_lock:
+            if _scheduler_service is None:
+                from .scheduler import Scheduler
+                _scheduler_service = Scheduler(holidays_client=holidays_service)
+    return _scheduler_service
+
+
+def warm_up_services():
+    """Create the services and load their heavy dependencies ahead of the first request."""
+    import pandas  # noqa: F401  (DataFrame adapters of the holidays endpoints)
+    scheduler = get_scheduler_service()
+    scheduler.geolocator
+    scheduler.timezone_finder
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    """With WARMUP_SERVICES=true, warm the services up in the background after startup."""
+    if os.getenv("WARMUP_SERVICES", "false").lower() == "true":
+        app.state.warm_up = asyncio.get_running_loop().run_in_executor(None, warm_up_services)
+
+
+@app.on_event("shutdown")
+async def close_services():
+    """Release connections held by the services."""
+    if _holidays_service is not None and hasattr(_holidays_service, "close"):
+        await _holidays_service.close()
 
 
 # Stats response model
@@ -49,6 +121,13 @@ class StatsResponseModel(BaseModel):
     emailStats: List[EmailStat]
 
 
+class StatsSummaryModel(BaseModel):
+    totalEmails: int
+    totalOpens: int
+    totalClicks: int
+    totalResponses: int
+
+
 # Pydantic models for scheduling (legacy feature)
 class PersonLocation(BaseModel):
     person_id: str
@@ -71,10 +150,16 @@ class ScheduleRequest(BaseModel):
 # COMPANIES ENDPOINTS
 # =============================================================================
 
-@app.get("/api/companies", response_model=List[Company])
-async def get_companies():
-    """Get all companies."""
+@app.get("/api/companies", response_model=Union[List[Company], CompanyPage])
+async def get_companies(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None)
+):
+    """Get all companies, or one keyset-paginated page when `limit` is given."""
     try:
+        if limit is not None:
+            companies, next_cursor = await storage.get_companies_page(limit, after)
+            return CompanyPage(data=companies, count=len(companies), next_cursor=next_cursor)
         companies = await storage.get_companies()
         return companies
     except Exception as e:
@@ -141,10 +226,17 @@ async def delete_company(company_id: str):
 # PEOPLE ENDPOINTS
 # =============================================================================
 
-@app.get("/api/people", response_model=List[Person])
-async def get_people(companyId: Optional[str] = Query(None)):
-    """Get all people, optionally filtered by company."""
+@app.get("/api/people", response_model=Union[List[Person], PersonPage])
+async def get_people(
+    companyId: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None)
+):
+    """Get all people, optionally filtered by company, or one page when `limit` is given."""
     try:
+        if limit is not None:
+            people, next_cursor = await storage.get_people_page(limit, after, company_id=companyId or None)
+            return PersonPage(data=people, count=len(people), next_cursor=next_cursor)
         if companyId:
             people = await storage.get_people_by_company(companyId)
         else:
@@ -214,12 +306,24 @@ async def delete_person(person_id: str):
 # EMAIL STATS ENDPOINTS
 # =============================================================================
 
-@app.get("/api/email-stats", response_model=List[EmailStat])
-async def get_email_stats(personId: Optional[str] = Query(None)):
-    """Get all email statistics, optionally filtered by person."""
+@app.get("/api/email-stats", response_model=Union[List[EmailStat], EmailStatPage])
+async def get_email_stats(
+    personId: Optional[str] = Query(None),
+    companyId: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None)
+):
+    """Get all email statistics, optionally filtered by person or company, or one page when `limit` is given."""
     try:
+        if limit is not None:
+            email_stats, next_cursor = await storage.get_email_stats_page(
+                limit, after, person_id=personId or None, company_id=companyId or None
+            )
+            return EmailStatPage(data=email_stats, count=len(email_stats), next_cursor=next_cursor)
         if personId:
             email_stats = await storage.get_email_stats_by_person(personId)
+        elif companyId:
+            email_stats = await storage.get_email_stats_by_company(companyId)
         else:
             email_stats = await storage.get_email_stats()
         return email_stats
@@ -247,21 +351,13 @@ async def create_email_stat(email_stat_data: EmailStatCreate):
 async def get_stats():
     """Get aggregated statistics for the dashboard."""
     try:
+        summary = await storage.get_stats_summary()
         companies = await storage.get_companies()
         people = await storage.get_people()
         email_stats = await storage.get_email_stats()
 
-        # Calculate aggregated stats
-        total_emails = sum(company.total_emails for company in companies)
-        total_opens = sum(company.open_count for company in companies)
-        total_clicks = sum(company.click_count for company in companies)
-        total_responses = sum(1 for company in companies if company.has_responded)
-
         return StatsResponseModel(
-            totalEmails=total_emails,
-            totalOpens=total_opens,
-            totalClicks=total_clicks,
-            totalResponses=total_responses,
+            **summary,
             companies=companies,
             people=people,
             emailStats=email_stats
@@ -270,99 +366,161 @@ async def get_stats():
         raise HTTPException(status_code=500, detail="Failed to fetch stats")
 
 
+@app.get("/api/stats/summary", response_model=StatsSummaryModel)
+async def get_stats_summary():
+    """Get only the aggregated dashboard totals, without the underlying rows."""
+    try:
+        summary = await storage.get_stats_summary()
+        return StatsSummaryModel(**summary)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to fetch stats summary")
+
+
 # =============================================================================
 # LEGACY SCHEDULING ENDPOINT
 # =============================================================================
 
+def _send_hour_24(request: ScheduleRequest) -> int:
+    """Convert the request's 12-hour send time to the 24-hour hour the scheduler expects."""
+    if request.send_am_pm.upper() == "PM" and request.send_hour != 12:
+        return request.send_hour + 12
+    if request.send_am_pm.upper() == "AM" and request.send_hour == 12:
+        return 0
+    return request.send_hour
+
+
+def _schedule_holidays_key(person: PersonLocation) -> str:
+    """Key of a person's location in the schedule response's holidays map."""
+    return f"{person.city or 'Unknown'}-{person.state or 'Unknown'}-{person.country}"
+
+
+def _schedule_person_result(person: PersonLocation, schedule_result) -> dict:
+    """Per-person entry of the schedule response, from a schedule dict or the exception raised for it."""
+    result = {
+        "person_id": person.person_id,
+        "name": person.name,
+        "location": {
+            "city": person.city,
+            "state": person.state,
+            "country": person.country
+        }
+    }
+    if isinstance(schedule_result, Exception):
+        result.update(schedule_dates=[], status="error", error=str(schedule_result))
+    else:
+        result.update(schedule_dates=schedule_result["scheduled_dates"], status="success")
+    return result
+
+
+def _schedule_summary(request: ScheduleRequest, successful_schedules: int, failed_schedules: int) -> dict:
+    return {
+        "total_people": len(request.people),
+        "successful_schedules": successful_schedules,
+        "failed_schedules": failed_schedules,
+        "schedule_parameters": {
+            "send_time": f"{request.send_hour}:{request.send_minute:02d} {request.send_am_pm}",
+            "buffer_hours": request.buffer_hours,
+            "start_date": request.start_date
+        }
+    }
+
+
+def _stream_schedule(request: ScheduleRequest, send_hour_24: int):
+    """
+    Yield the schedule response as NDJSON lines.
+
+    One {"type": "result", ...} line per person, in the order their locations
+    finish, then a {"type": "summary", "holidays": ..., "summary": ...} trailer.
+    StreamingResponse iterates this generator in a worker thread.
+    """
+    holidays_data = {}
+    successful_schedules = 0
+    failed_schedules = 0
+
+    try:
+        for indexes, schedule_results in get_scheduler_service().iter_email_schedules(
+            [(person.city, person.state, person.country) for person in request.people],
+            start_date_str=request.start_date,
+            send_hour=send_hour_24,
+            buffer_hours=request.buffer_hours
+        ):
+            lines = []
+            for index, schedule_result in zip(indexes, schedule_results):
+                person = request.people[index]
+                result = _schedule_person_result(person, schedule_result)
+                if result["status"] == "success":
+                    successful_schedules += 1
+                    holidays_data.setdefault(_schedule_holidays_key(person), {
+                        "holidays": schedule_result["holidays"],
+                        "location": schedule_result["location"]
+                    })
+                else:
+                    failed_schedules += 1
+                lines.append(codec.dumps({"type": "result", **result}))
+            yield b"\n".join(lines) + b"\n"
+    except Exception as e:
+        # The status line has already been sent, so report the failure in-band
+        yield codec.dumps({"type": "error", "error": f"Scheduling error: {str(e)}"}) + b"\n"
+        return
+
+    yield codec.dumps({
+        "type": "summary",
+        "holidays": holidays_data,
+        "summary": _schedule_summary(request, successful_schedules, failed_schedules)
+    }) + b"\n"
+
+
 @app.post("/api/schedule")
-async def create_schedule(request: ScheduleRequest):
+async def create_schedule(request: ScheduleRequest, stream: bool = Query(False)):
     """
     Create email schedules for multiple people based on their locations.
     
     Args:
         request: ScheduleRequest containing people data and scheduling parameters
+        stream: Stream the results as NDJSON (application/x-ndjson): one line per
+            person as soon as their location is scheduled, then a summary line
+            carrying the holidays map and the summary
         
     Returns:
         Dictionary with scheduling results for each person
     """
     try:
-        results = {}
+        send_hour_24 = _send_hour_24(request)
         
-        # Convert 12-hour format to 24-hour format for scheduler
-        if request.send_am_pm.upper() == "PM" and request.send_hour != 12:
-            send_hour_24 = request.send_hour + 12
-        elif request.send_am_pm.upper() == "AM" and request.send_hour == 12:
-            send_hour_24 = 0
-        else:
-            send_hour_24 = request.send_hour
+        if stream:
+            return StreamingResponse(_stream_schedule(request, send_hour_24), media_type="application/x-ndjson")
         
-        # Process each person
+        # Schedule every distinct location once, concurrently, off the event loop
+        outcomes = await asyncio.to_thread(
+            get_scheduler_service().get_email_schedules,
+            [(person.city, person.state, person.country) for person in request.people],
+            start_date_str=request.start_date,
+            send_hour=send_hour_24,
+            buffer_hours=request.buffer_hours
+        )
+        
+        # Fan the results out to each person
+        results = {}
         holidays_data = {}  # Store holidays by location to avoid duplicates
         
-        for person in request.people:
-            try:
-                # Get schedule and holidays for this person
-                schedule_result = scheduler_service.get_email_schedule(
-                    city=person.city,
-                    state=person.state,
-                    country=person.country,
-                    start_date_str=request.start_date,
-                    send_hour=send_hour_24,
-                    buffer_hours=request.buffer_hours
-                )
-                
-                # Store holidays data by location key to avoid duplicates
-                location_key = f"{person.city or 'Unknown'}-{person.state or 'Unknown'}-{person.country}"
-                if location_key not in holidays_data:
-                    holidays_data[location_key] = {
-                        "holidays": schedule_result["holidays"],
-                        "location": schedule_result["location"]
-                    }
-                
-                results[person.person_id] = {
-                    "person_id": person.person_id,
-                    "name": person.name,
-                    "location": {
-                        "city": person.city,
-                        "state": person.state,
-                        "country": person.country
-                    },
-                    "schedule_dates": schedule_result["scheduled_dates"],
-                    "status": "success"
-                }
-                
-            except Exception as person_error:
-                results[person.person_id] = {
-                    "person_id": person.person_id,
-                    "name": person.name,
-                    "location": {
-                        "city": person.city,
-                        "state": person.state,
-                        "country": person.country
-                    },
-                    "schedule_dates": [],
-                    "status": "error",
-                    "error": str(person_error)
-                }
+        for person, schedule_result in zip(request.people, outcomes):
+            result = _schedule_person_result(person, schedule_result)
+            if result["status"] == "success":
+                holidays_data.setdefault(_schedule_holidays_key(person), {
+                    "holidays": schedule_result["holidays"],
+                    "location": schedule_result["location"]
+                })
+            results[person.person_id] = result
         
         # Calculate summary
         successful_schedules = sum(1 for result in results.values() if result["status"] == "success")
         failed_schedules = len(results) - successful_schedules
         
-        return {
+        return CodecJSONResponse({
             "results": results,
             "holidays": holidays_data,
-            "summary": {
-                "total_people": len(request.people),
-                "successful_schedules": successful_schedules,
-                "failed_schedules": failed_schedules,
-                "schedule_parameters": {
-                    "send_time": f"{request.send_hour}:{request.send_minute:02d} {request.send_am_pm}",
-                    "buffer_hours": request.buffer_hours,
-                    "start_date": request.start_date
-                }
-            }
-        }
+            "summary": _schedule_summary(request, successful_schedules, failed_schedules)
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scheduling error: {str(e)}")
@@ -385,7 +543,8 @@ async def get_holidays(
     year: int,
     countries: Optional[str] = "all",
     include_mandate: bool = True,
-    format: str = "json"
+    format: str = "json",
+    refresh: bool = False
 ):
     """
     Get holidays for specified countries and year.
@@ -395,6 +554,7 @@ async def get_holidays(
         countries: Country name, comma-separated list, or 'all' for all countries
         include_mandate: Whether to include mandate holidays
         format: Response format ('json' or 'csv')
+        refresh: Refetch from the holidays API instead of using cached data
     """
     try:
         # Parse countries parameter
@@ -404,10 +564,11 @@ async def get_holidays(
             countries_list = [country.strip() for country in countries.split(",")]
         
         # Fetch holidays
-        df = holidays_service.get_holidays(
+        df = await get_holidays_service().get_holidays_async(
             year=year,
             countries=countries_list,
-            include_mandate=include_mandate
+            include_mandate=include_mandate,
+            refresh=refresh
         )
         
         if format.lower() == "csv":
@@ -417,13 +578,13 @@ async def get_holidays(
         else:
             # Return JSON format
             holidays_data = df.to_dict("records")
-            return {
+            return CodecJSONResponse({
                 "data": holidays_data,
                 "format": "json",
                 "count": len(holidays_data),
                 "year": year,
                 "countries": countries
-            }
+            })
             
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -435,7 +596,8 @@ async def get_holidays(
 async def get_holidays_by_country(
     country: str,
     year: int,
-    include_mandate: bool = True
+    include_mandate: bool = True,
+    refresh: bool = False
 ):
     """
     Get holidays for a specific country.
@@ -444,21 +606,23 @@ async def get_holidays_by_country(
         country: Country name
         year: Year for which to fetch holidays
         include_mandate: Whether to include mandate holidays
+        refresh: Refetch from the holidays API instead of using cached data
     """
     try:
-        df = holidays_service.get_holidays(
+        df = await get_holidays_service().get_holidays_async(
             year=year,
             countries=country,
-            include_mandate=include_mandate
+            include_mandate=include_mandate,
+            refresh=refresh
         )
         
         holidays_data = df.to_dict("records")
-        return {
+        return CodecJSONResponse({
             "data": holidays_data,
             "count": len(holidays_data),
             "country": country,
             "year": year
-        }
+        })
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -471,12 +635,13 @@ async def get_supported_countries():
     """Get list of supported countries."""
     try:
         import pycountry
+        name_mappings = get_holidays_service().country_name_mappings
         countries = [
             {
                 "name": country.name,
                 "code": country.alpha_2,
                 "common_name": next(
-                    (k for k, v in holidays_service.country_name_mappings.items() if v == country.name),
+                    (k for k, v in name_mappings.items() if v == country.name),
                     country.name
                 )
             }
@@ -578,4 +743,5 @@ async def update_email_data(email_update: EmailDataUpdate):
 
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
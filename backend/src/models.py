@@ -281,3 +281,21 @@ class StatsResponse(BaseModel):
     companies: list[Company]
     people: list[Person]
     email_stats: list[EmailStat]
+
+class CompanyPage(BaseModel):
+    """One keyset-paginated page of companies"""
+    data: list[Company]
+    count: int = Field(..., description="Number of items in this page")
+    next_cursor: Optional[str] = Field(None, description="Pass as `after` to fetch the next page; null on the last page")
+
+class PersonPage(BaseModel):
+    """One keyset-paginated page of people"""
+    data: list[Person]
+    count: int = Field(..., description="Number of items in this page")
+    next_cursor: Optional[str] = Field(None, description="Pass as `after` to fetch the next page; null on the last page")
+
+class EmailStatPage(BaseModel):
+    """One keyset-paginated page of email stats"""
+    data: list[EmailStat]
+    count: int = Field(..., description="Number of items in this page")
+    next_cursor: Optional[str] = Field(None, description="Pass as `after` to fetch the next page; null on the last page")
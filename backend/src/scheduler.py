@@ -1,16 +1,105 @@
-from datetime import datetime, timedelta
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Dict, Any, Callable, FrozenSet, Iterator, List, Sequence, Tuple, Union
+import numpy as np
 import pytz
-import pycountry
-from geopy.geocoders import Nominatim
-from timezonefinder import TimezoneFinder
-from .holidays import Holidays
+from .cache import MISSING, TieredCache
+from .gazetteer import Gazetteer
+from .holidays import Holidays, HolidayRecord
+
+
+DEFAULT_GEOCODE_CACHE_PATH = os.path.join(os.path.dirname(__file__), "database", "data", "geocode_cache.sqlite3")
+# Places don't move; misses are retried sooner in case Nominatim was having a bad day
+DEFAULT_GEOCODE_CACHE_TTL = 90 * 24 * 3600
+DEFAULT_GEOCODE_NEGATIVE_TTL = 24 * 3600
+
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+BUSINESS_WEEKMASK = "1111100"
+
+
+def normalize_location(location_string: str) -> str:
+    """Cache key for a location string: lowercase, single spaces, ', ' between parts."""
+    parts = (" ".join(part.split()) for part in location_string.lower().split(","))
+    return ", ".join(part for part in parts if part)
+
+
+def schedule_hops(schedule_chain: Dict[str, str]) -> np.ndarray:
+    """A weekday -> next weekday chain as calendar days to move forward, indexed Monday=0..Friday=4."""
+    hops = []
+    for weekday, weekday_name in enumerate(WEEKDAY_NAMES[:5]):
+        if weekday_name not in schedule_chain:
+            raise ValueError(f"No mapping for weekday: {weekday_name}")
+        target_weekday = WEEKDAY_NAMES.index(schedule_chain[weekday_name])
+        hops.append((target_weekday - weekday - 1) % 7 + 1)
+    return np.array(hops, dtype="timedelta64[D]")
+
+
+def schedule_business_days(start_dates: np.ndarray, calendar: np.busdaycalendar,
+                           hops: np.ndarray, count: int = 3) -> np.ndarray:
+    """
+    Chained send dates for many start dates at once.
+
+    The first date is the first business day on or after each start date; each
+    following one is `hops[weekday]` calendar days after the previous date,
+    rolled forward to the next business day.
+
+    Args:
+        start_dates: datetime64[D] array of start dates.
+        calendar: Business days (weekmask and holidays) to schedule on.
+        hops: Calendar days to move forward from each weekday, indexed Monday=0..Friday=4.
+        count: Dates per start date.
+
+    Returns:
+        datetime64[D] array of shape (len(start_dates), count).
+    """
+    dates = np.busday_offset(start_dates, 0, roll="forward", busdaycal=calendar)
+    chain = [dates]
+    for _ in range(count - 1):
+        # 1970-01-01 (day 0) was a Thursday
+        weekdays = (dates.astype(np.int64) + 3) % 7
+        dates = np.busday_offset(dates + hops[weekdays], 0, roll="forward", busdaycal=calendar)
+        chain.append(dates)
+    return np.stack(chain, axis=-1)
 
 
 class Scheduler:
-    def __init__(self):
-        self.geolocator = Nominatim(user_agent="geo_email_scheduler")
-        self.timezone_finder = TimezoneFinder()
-        self.holidays_client = Holidays()
+    def __init__(self, holidays_client: Optional[Holidays] = None,
+                 gazetteer: Optional[Gazetteer] = None,
+                 geocode_cache_path: Optional[str] = None,
+                 geocode_cache_ttl: Optional[float] = None,
+                 geocode_negative_ttl: Optional[float] = None):
+        """
+        Args:
+            holidays_client: Holidays service to use (default: a new one).
+            gazetteer: Offline timezone resolver tried before geocoding (default: the bundled one).
+            geocode_cache_path: SQLite file caching geocoded locations
+                (default: GEOCODE_CACHE_PATH env var or database/data/geocode_cache.sqlite3).
+            geocode_cache_ttl: Seconds a resolved location is kept
+                (default: GEOCODE_CACHE_TTL env var or 90 days). 0 disables caching.
+            geocode_negative_ttl: Seconds an unresolvable location is remembered
+                (default: GEOCODE_NEGATIVE_TTL env var or one day).
+        """
+        # geopy and timezonefinder (which loads its polygon data) are set up on first use
+        self._geolocator = None
+        self._timezone_finder = None
+        # Nominatim allows about one request per second, so geocode one location at a time
+        self._geocode_lock = threading.Lock()
+        self.holidays_client = holidays_client or Holidays()
+        self.gazetteer = gazetteer or Gazetteer()
+
+        # Geocoding results (coordinates + timezone) per normalized location string
+        if geocode_cache_ttl is None:
+            geocode_cache_ttl = float(os.getenv("GEOCODE_CACHE_TTL", DEFAULT_GEOCODE_CACHE_TTL))
+        if geocode_negative_ttl is None:
+            geocode_negative_ttl = float(os.getenv("GEOCODE_NEGATIVE_TTL", DEFAULT_GEOCODE_NEGATIVE_TTL))
+        geocode_cache_path = geocode_cache_path or os.getenv("GEOCODE_CACHE_PATH", DEFAULT_GEOCODE_CACHE_PATH)
+        self.geocode_negative_ttl = geocode_negative_ttl
+        self.geocode_cache = (
+            TieredCache(geocode_cache_path, ttl=geocode_cache_ttl, maxsize=4096, table="geocode")
+            if geocode_cache_ttl > 0 else None
+        )
         self.schedule_chain = {
             'Monday': 'Thursday',
             'Tuesday': 'Friday',
@@ -18,9 +107,89 @@ class Scheduler:
             'Thursday': 'Monday',
             'Friday': 'Tuesday',
         }
+        # Business-day calendars per (country code, year), with the holiday dates they were built from
+        self._calendars: Dict[Tuple[str, int], Tuple[FrozenSet[date], np.busdaycalendar]] = {}
+        self._calendars_lock = threading.Lock()
+
+    @property
+    def geolocator(self):
+        if self._geolocator is None:
+            from geopy.geocoders import Nominatim
+            self._geolocator = Nominatim(user_agent="geo_email_scheduler")
+        return self._geolocator
+
+    @property
+    def timezone_finder(self):
+        if self._timezone_finder is None:
+            from timezonefinder import TimezoneFinder
+            self._timezone_finder = TimezoneFinder()
+        return self._timezone_finder
+
+    def locate(self, location_string: str) -> Optional[Dict[str, Any]]:
+        """
+        Geocode a location and resolve its timezone, using the geocode cache.
+
+        Returns:
+            dict with latitude, longitude and timezone (None if no timezone covers the point),
+            or None if the location could not be found.
+        """
+        key = normalize_location(location_string)
+        if self.geocode_cache is not None:
+            cached = self.geocode_cache.get(key)
+            if cached is not MISSING:
+                return cached
+
+        with self._geocode_lock:
+            # Another thread may have geocoded the same location while we waited
+            if self.geocode_cache is not None:
+                cached = self.geocode_cache.get(key)
+                if cached is not MISSING:
+                    return cached
+
+            location_data = self.geolocator.geocode(location_string)
+            if location_data:
+                result = {
+                    "latitude": location_data.latitude,
+                    "longitude": location_data.longitude,
+                    "timezone": self.timezone_finder.timezone_at(
+                        lat=location_data.latitude, lng=location_data.longitude
+                    ),
+                }
+            else:
+                result = None
+
+            if self.geocode_cache is not None:
+                if result is None or result["timezone"] is None:
+                    self.geocode_cache.set(key, result, ttl=self.geocode_negative_ttl)
+                else:
+                    self.geocode_cache.set(key, result)
+        return result
+
+    def resolve_timezone(self, location_string: str, country_code: str,
+                         city: str | None = None, state: str | None = None) -> str:
+        """
+        Resolve a location's timezone: offline from the gazetteer when possible,
+        otherwise by geocoding (cached) as a last resort.
+
+        Raises:
+            ValueError: If the location can't be found or has no timezone.
+        """
+        timezone_name = self.gazetteer.resolve(country_code, city=city, state=state)
+        if timezone_name:
+            return timezone_name
+
+        location_data = self.locate(location_string)
+        if not location_data:
+            raise ValueError(f"Could not find location: {location_string}")
+        if not location_data["timezone"]:
+            raise ValueError(f"Could not resolve timezone for: {location_string}")
+        return location_data["timezone"]
 
     def get_country_code(self, country_name: str) -> str | None:
         """Return ISO alpha-2 code for a given country name using pycountry."""
+        import pycountry
+        # Same aliases as the holidays lookup (USA, UK, Russia, ...)
+        country_name = self.holidays_client.country_name_mappings.get(country_name, country_name)
         try:
             country = pycountry.countries.get(name=country_name)
             if country:
@@ -36,20 +205,24 @@ class Scheduler:
             pass
         return None
 
-    def is_weekend(self, date_object: datetime) -> bool:
-        return date_object.weekday() >= 5
-
-    def is_holiday(self, date_object: datetime, holiday_dates: set) -> bool:
-        return date_object.date() in holiday_dates
-
     def is_past_buffer_today(self, date_object: datetime, current_datetime: datetime,
                              send_hour: int, buffer_hours: int) -> bool:
         return date_object.date() == current_datetime.date() and current_datetime.hour >= send_hour - buffer_hours
 
-    def advance_to_next_weekday(self, start_date_object: datetime, target_weekday_name: str) -> datetime:
-        while start_date_object.strftime("%A") != target_weekday_name:
-            start_date_object += timedelta(days=1)
-        return start_date_object
+    def business_day_calendar(self, country_code: str, year: int, holiday_dates: FrozenSet[date]) -> np.busdaycalendar:
+        """Monday-Friday calendar without the given holidays, kept per (country, year) until the holidays change."""
+        key = (country_code, year)
+        with self._calendars_lock:
+            cached = self._calendars.get(key)
+            if cached is not None and cached[0] == holiday_dates:
+                return cached[1]
+        calendar = np.busdaycalendar(
+            weekmask=BUSINESS_WEEKMASK,
+            holidays=np.array(sorted(holiday_dates), dtype="datetime64[D]")
+        )
+        with self._calendars_lock:
+            self._calendars[key] = (holiday_dates, calendar)
+        return calendar
 
     def get_email_schedule(self,
                            city: str | None = None,
@@ -57,8 +230,14 @@ class Scheduler:
                            country: str = 'India',
                            start_date_str: str | None = None,
                            send_hour: int = 8,
-                           buffer_hours: int = 2) -> dict:
-        """Generate the next 3 scheduled dates at send_hour, excluding weekends and holidays."""
+                           buffer_hours: int = 2,
+                           holidays_lookup: Callable[[int, str], List[HolidayRecord]] | None = None) -> dict:
+        """
+        Generate the next 3 scheduled dates at send_hour, excluding weekends and holidays.
+
+        holidays_lookup(year, country) replaces the holidays client lookup; batch
+        scheduling uses it to fetch each country's holidays once.
+        """
         
         # Location string construction: either city,country OR state,country (never both)
         if city and city.strip():
@@ -74,20 +253,12 @@ class Scheduler:
         if not location_string.strip():
             raise ValueError("No valid location provided (city, state, or country)")
             
-        location_data = self.geolocator.geocode(location_string)
-        if not location_data:
-            raise ValueError(f"Could not find location: {location_string}")
-
-        timezone_name = self.timezone_finder.timezone_at(
-            lat=location_data.latitude, lng=location_data.longitude
-        )
-        if not timezone_name:
-            raise ValueError(f"Could not resolve timezone for: {location_string}")
-        local_timezone = pytz.timezone(timezone_name)
-
         country_code = self.get_country_code(country)
         if not country_code:
             raise ValueError(f"Country '{country}' not supported by the holidays library.")
+
+        timezone_name = self.resolve_timezone(location_string, country_code, city=city, state=state)
+        local_timezone = pytz.timezone(timezone_name)
         
         current_datetime_utc = datetime.utcnow()
         current_datetime_local = pytz.utc.localize(current_datetime_utc).astimezone(local_timezone)
@@ -95,65 +266,42 @@ class Scheduler:
         # Get holidays for the current year using our custom Holidays class
         # Pass the original country name - the Holidays class handles mapping internally
         current_year = current_datetime_local.year
-        holidays_df = self.holidays_client.get_holidays(current_year, countries=country)
+        if holidays_lookup is None:
+            holidays = self.holidays_client.get_holiday_records(current_year, countries=country)
+        else:
+            holidays = holidays_lookup(current_year, country)
         
-        # Convert to a set of dates for fast lookup
-        holiday_dates = set()
-        if not holidays_df.empty:
-            for _, row in holidays_df.iterrows():
-                try:
-                    holiday_date = datetime.strptime(row['date'], '%Y-%m-%d').date()
-                    holiday_dates.add(holiday_date)
-                except:
-                    continue
+        calendar = self.business_day_calendar(
+            country_code, current_year, frozenset(holiday.date for holiday in holidays)
+        )
 
-        current_date_object = (
-            current_datetime_local
+        start_date = (
+            current_datetime_local.date()
             if start_date_str is None
-            else local_timezone.localize(datetime.strptime(start_date_str, "%Y-%m-%d"))
+            else datetime.strptime(start_date_str, "%Y-%m-%d").date()
         )
+        if self.is_past_buffer_today(datetime.combine(start_date, time()), current_datetime_local, send_hour, buffer_hours):
+            start_date += timedelta(days=1)
 
-        scheduled_dates: list[str] = []
-
-        while len(scheduled_dates) < 3:
-            current_weekday_name = current_date_object.strftime("%A")
-
-            if (
-                not self.is_weekend(current_date_object)
-                and not self.is_holiday(current_date_object, holiday_dates)
-                and not self.is_past_buffer_today(current_date_object, current_datetime_local, send_hour, buffer_hours)
-            ):
-                scheduled_datetime = current_date_object.replace(
-                    hour=send_hour, minute=0, second=0, microsecond=0
-                )
-                scheduled_dates.append(scheduled_datetime.strftime('%Y-%m-%d %I:%M %p'))
-
-                if current_weekday_name not in self.schedule_chain:
-                    raise ValueError(f"No mapping for weekday: {current_weekday_name}")
-                target_next_weekday = self.schedule_chain[current_weekday_name]
-                current_date_object = self.advance_to_next_weekday(
-                    current_date_object + timedelta(days=1),
-                    target_next_weekday
-                )
-            else:
-                current_date_object += timedelta(days=1)
+        send_dates = schedule_business_days(
+            np.array([start_date], dtype="datetime64[D]"), calendar, schedule_hops(self.schedule_chain)
+        )[0]
+        scheduled_dates: list[str] = [
+            datetime.combine(send_date, time(hour=send_hour)).strftime('%Y-%m-%d %I:%M %p')
+            for send_date in send_dates.tolist()
+        ]
 
         # Format holidays data for frontend
-        holidays_list = []
-        if not holidays_df.empty:
-            for _, row in holidays_df.iterrows():
-                try:
-                    holiday_date = datetime.strptime(row['date'], '%Y-%m-%d')
-                    holidays_list.append({
-                        "date": row['date'],  # Keep original YYYY-MM-DD format
-                        "name": row['name'],
-                        "display_date": holiday_date.strftime('%B %d, %Y'),
-                        "month": holiday_date.month,
-                        "day": holiday_date.day
-                    })
-                except Exception as e:
-                    print(f"Error processing holiday {row.get('name', 'Unknown')}: {e}")
-                    continue
+        holidays_list = [
+            {
+                "date": holiday.date.isoformat(),  # YYYY-MM-DD
+                "name": holiday.name,
+                "display_date": holiday.date.strftime('%B %d, %Y'),
+                "month": holiday.date.month,
+                "day": holiday.date.day
+            }
+            for holiday in holidays
+        ]
 
         return {
             "scheduled_dates": scheduled_dates,
@@ -166,6 +314,114 @@ class Scheduler:
             }
         }
 
+    @staticmethod
+    def location_key(city: str | None, state: str | None, country: str | None) -> Tuple[str, str, str]:
+        """Grouping key for batch scheduling: (city, state, country), normalized."""
+        return tuple(normalize_location(part or "") for part in (city, state, country))
+
+    @staticmethod
+    def _with_location(outcome: dict, city: str | None, state: str | None, country: str | None) -> dict:
+        """A schedule computed for an equivalent location, echoing this input's own location."""
+        location = outcome["location"]
+        if (location["city"], location["state"], location["country"]) == (city, state, country):
+            return outcome
+        return {**outcome, "location": {**location, "city": city, "state": state, "country": country}}
+
+    def _shared_holidays_lookup(self) -> Callable[[int, str], List[HolidayRecord]]:
+        """
+        holidays_lookup for one batch: each (year, country) is fetched once, and
+        concurrent callers asking for the same one wait for that fetch.
+        """
+        fetches: Dict[Tuple[int, str], Future] = {}
+        lock = threading.Lock()
+
+        def lookup(year: int, country: str) -> List[HolidayRecord]:
+            with lock:
+                fetch = fetches.get((year, country))
+                owner = fetch is None
+                if owner:
+                    fetch = fetches[(year, country)] = Future()
+            if owner:
+                try:
+                    fetch.set_result(self.holidays_client.get_holiday_records(year, countries=country))
+                except Exception as e:
+                    fetch.set_exception(e)
+            return fetch.result()
+
+        return lookup
+
+    def iter_email_schedules(self,
+                             locations: Sequence[Tuple[str | None, str | None, str]],
+                             start_date_str: str | None = None,
+                             send_hour: int = 8,
+                             buffer_hours: int = 2,
+                             max_workers: int = 8) -> Iterator[Tuple[List[int], Union[dict, Exception]]]:
+        """
+        Schedule many (city, state, country) locations, computing each distinct location once.
+
+        Distinct locations are scheduled concurrently on a thread pool.
+
+        Yields:
+            (indexes, outcomes) as each distinct location finishes: the positions in
+            `locations` sharing it, and for each of them its get_email_schedule result
+            or the exception raised for the location. The results share the dates,
+            holidays and timezone, but each echoes its own city, state and country.
+        """
+        groups: Dict[Tuple[str, str, str], List[int]] = {}
+        for index, (city, state, country) in enumerate(locations):
+            groups.setdefault(self.location_key(city, state, country), []).append(index)
+        if not groups:
+            return
+
+        holidays_lookup = self._shared_holidays_lookup()
+
+        def schedule(index: int) -> Union[dict, Exception]:
+            city, state, country = locations[index]
+            try:
+                return self.get_email_schedule(
+                    city=city,
+                    state=state,
+                    country=country,
+                    start_date_str=start_date_str,
+                    send_hour=send_hour,
+                    buffer_hours=buffer_hours,
+                    holidays_lookup=holidays_lookup
+                )
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups)), thread_name_prefix="scheduler") as executor:
+            futures = {executor.submit(schedule, indexes[0]): indexes for indexes in groups.values()}
+            for future in as_completed(futures):
+                indexes = futures[future]
+                outcome = future.result()
+                if isinstance(outcome, Exception):
+                    yield indexes, [outcome] * len(indexes)
+                else:
+                    yield indexes, [self._with_location(outcome, *locations[index]) for index in indexes]
+
+    def get_email_schedules(self,
+                            locations: Sequence[Tuple[str | None, str | None, str]],
+                            start_date_str: str | None = None,
+                            send_hour: int = 8,
+                            buffer_hours: int = 2,
+                            max_workers: int = 8) -> List[Union[dict, Exception]]:
+        """
+        Batch version of get_email_schedule (see iter_email_schedules).
+
+        Returns:
+            One outcome per input location, in input order: the schedule dict or the
+            exception raised for it.
+        """
+        outcomes: List[Union[dict, Exception]] = [None] * len(locations)
+        for indexes, group_outcomes in self.iter_email_schedules(
+            locations, start_date_str=start_date_str, send_hour=send_hour,
+            buffer_hours=buffer_hours, max_workers=max_workers
+        ):
+            for index, outcome in zip(indexes, group_outcomes):
+                outcomes[index] = outcome
+        return outcomes
+
 
 # Example usage function
 def example_usage():
@@ -0,0 +1,11 @@
+import pytest
+
+from src.database.storage import JSONStorage
+
+
+@pytest.fixture
+def make_storage(tmp_path):
+    """Build JSONStorage instances over one temporary data directory."""
+    def make(**kwargs):
+        return JSONStorage(tmp_path, **kwargs)
+    return make
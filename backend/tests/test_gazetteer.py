@@ -0,0 +1,33 @@
+import pytest
+
+from src.gazetteer import Gazetteer
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return Gazetteer()
+
+
+@pytest.mark.parametrize("city, state, expected", [
+    ("LA", None, "America/Los_Angeles"),
+    ("Washington", None, "America/New_York"),
+    ("Washington, D.C.", None, "America/New_York"),
+    ("  New   York ", None, "America/New_York"),
+    (None, "Washington", "America/Los_Angeles"),
+    (None, "LA", "America/Chicago"),
+    ("Springfield", "IL", "America/Chicago"),
+])
+def test_us_places(gazetteer, city, state, expected):
+    assert gazetteer.resolve("US", city=city, state=state) == expected
+
+
+def test_cities_are_not_matched_against_state_codes(gazetteer):
+    # "Al" is Alabama's code; as a city it is unknown, so the caller geocodes it
+    assert gazetteer.resolve("US", city="AL") is None
+    assert gazetteer.resolve("us", city="Ontario") is None
+
+
+def test_country_fallbacks(gazetteer):
+    assert gazetteer.resolve("IN", city="Nowhere") == "Asia/Kolkata"
+    assert gazetteer.resolve("DE", city="Nowhere") == "Europe/Berlin"
+    assert gazetteer.resolve("ZZ", city="Nowhere") is None
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from datetime import date
+
+import httpx
+import pytest
+
+import src.main as api
+from src.database.xata import DatabaseManager
+from src.holidays import Holidays
+from src.holidays_db import DatabaseHolidays
+
+# The scheduler looks holidays up for the current year
+YEAR = date.today().year
+HOLIDAY_ROWS = [
+    {"country": "IN", "name": "Republic Day", "date": date(YEAR, 1, 26), "holiday_type": "National Holiday"},
+    {"country": "IN", "name": "Independence Day", "date": date(YEAR, 8, 15), "holiday_type": "National Holiday"},
+]
+
+
+class TableOnlyDatabase(DatabaseManager):
+    """DatabaseManager answering SELECTs on the holidays table from HOLIDAY_ROWS."""
+
+    def __init__(self):
+        super().__init__()
+        self.query_threads = []
+
+    async def connect(self):
+        self._is_connected = True
+
+    async def disconnect(self):
+        self._is_connected = False
+
+    async def _run(self, query):
+        self.query_threads.append(threading.current_thread().name)
+        country_codes, start, end = query.params
+        return [row for row in HOLIDAY_ROWS if row["country"] in country_codes and start <= row["date"] <= end]
+
+
+@pytest.fixture
+def no_holidays_api(monkeypatch):
+    """Fail any request to the external holidays API."""
+    requested = []
+
+    def request_holidays(self, country_code, year):
+        requested.append((country_code, year))
+        raise AssertionError(f"holidays API called for {country_code} {year}")
+
+    monkeypatch.setattr(Holidays, "_request_holidays", request_holidays)
+    return requested
+
+
+def test_sync_lookup_reads_the_table(no_holidays_api):
+    db = TableOnlyDatabase()
+    holidays = DatabaseHolidays(db=db, cache_ttl=0)
+    try:
+        records = holidays.get_holiday_records(YEAR, countries="India", include_mandate=False)
+        frame = holidays.get_holidays(YEAR, countries="India", include_mandate=False)
+    finally:
+        asyncio.run(holidays.close())
+
+    assert [(record.name, record.date) for record in records] == [
+        ("Republic Day", date(YEAR, 1, 26)), ("Independence Day", date(YEAR, 8, 15)),
+    ]
+    assert len(frame) == 2
+    assert set(db.query_threads) == {"holidays-db"}
+    assert no_holidays_api == []
+
+
+def test_missing_countries_fall_back_to_the_api(monkeypatch):
+    fetched = []
+    monkeypatch.setattr(Holidays, "fetch_holiday_records",
+                        lambda self, year, codes, **kwargs: fetched.extend(codes) or [])
+    holidays = DatabaseHolidays(db=TableOnlyDatabase(), cache_ttl=0)
+    try:
+        holidays.get_holiday_records(YEAR, countries=["India", "Japan"])
+    finally:
+        asyncio.run(holidays.close())
+    assert fetched == ["JP"]
+
+
+def test_schedule_endpoint_makes_no_holiday_api_calls(monkeypatch, no_holidays_api):
+    db = TableOnlyDatabase()
+    holidays = DatabaseHolidays(db=db, cache_ttl=0)
+    monkeypatch.setattr(api, "_holidays_service", holidays)
+    monkeypatch.setattr(api, "_scheduler_service", None)
+    body = {
+        "people": [
+            {"person_id": "1", "name": "Ada", "city": "Bangalore", "country": "India"},
+            {"person_id": "2", "name": "Bob", "city": "Mumbai", "country": "India"},
+        ],
+    }
+
+    async def schedule():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/schedule", json=body)
+        await holidays.close()
+        return response
+
+    response = asyncio.run(schedule())
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["summary"]["successful_schedules"] == 2
+    holiday_names = {holiday["name"] for holiday in payload["holidays"]["Bangalore-Unknown-India"]["holidays"]}
+    assert {"Republic Day", "Independence Day"} <= holiday_names
+    assert db.query_threads
+    assert no_holidays_api == []
@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.holidays import Holidays, TokenBucket
+
+COUNTRIES = ["IN", "JP", "US", "FR", "DE", "GB", "CA", "AU", "BR", "MX", "IT", "ES"]
+LATENCY = 0.1
+
+
+@pytest.fixture
+def stub_api():
+    """Local holidays API stub that answers after LATENCY and tracks concurrent requests."""
+    state = {"in_flight": 0, "max_in_flight": 0, "requests": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            country, year = query["country"][0], query["year"][0]
+            with lock:
+                state["requests"] += 1
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            time.sleep(LATENCY)
+            with lock:
+                state["in_flight"] -= 1
+            body = json.dumps([
+                {"name": f"{country} Day", "date": f"{year}-03-01", "type": "Public Holiday"},
+            ]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1/holidays", state
+    server.shutdown()
+    server.server_close()
+
+
+def test_countries_are_fetched_concurrently_in_order(stub_api):
+    url, state = stub_api
+    holidays = Holidays(base_url=url, max_workers=6, rate_limit=0, cache_ttl=0)
+
+    start = time.perf_counter()
+    records = holidays.fetch_holiday_records(2025, COUNTRIES)
+    elapsed = time.perf_counter() - start
+
+    assert [record["country"] for record in records] == COUNTRIES
+    assert records[0] == {"country": "IN", "name": "IN Day", "date": "2025-03-01", "type": "Public Holiday"}
+    assert state["requests"] == len(COUNTRIES)
+    assert 2 <= state["max_in_flight"] <= 6
+    # Serially this takes len(COUNTRIES) * LATENCY
+    assert elapsed < len(COUNTRIES) * LATENCY / 2
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.perf_counter()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.perf_counter() - start >= 10 / 50 - 0.02
+
+    # Tokens refill up to capacity, so an idle bucket allows a burst
+    bursty = TokenBucket(rate=5, capacity=4)
+    start = time.perf_counter()
+    for _ in range(4):
+        bursty.acquire()
+    assert time.perf_counter() - start < 0.1
+
+
+def test_failed_requests_are_not_cached(tmp_path):
+    holidays = Holidays(base_url="http://127.0.0.1:9/unreachable", timeout=0.5,
+                        cache_path=str(tmp_path / "cache.sqlite3"))
+    assert holidays.fetch_holiday_records(2025, ["IN"]) == []
+    assert holidays.get_cached_holidays("IN", 2025) is None
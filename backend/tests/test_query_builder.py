@@ -0,0 +1,111 @@
+import re
+
+import pytest
+
+from src.database.xata import DatabaseManager
+from src.database.xata.database import MAX_QUERY_PARAMS, sql_cache
+
+
+@pytest.fixture
+def db():
+    return DatabaseManager()
+
+
+def squash(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def test_in_and_not_in_bind_one_array(db):
+    query = (db.select("id").from_("people")
+             .where("country").in_(["IN", "JP"])
+             .and_where("status").not_in(("sent",))
+             .and_where("age").between(20, 30)
+             .limit(10)
+             ._build())
+    assert query.sql == ("SELECT id FROM people WHERE country = ANY($1) AND status <> ALL($2) "
+                         "AND age BETWEEN $3 AND $4 LIMIT $5")
+    assert query.params == [["IN", "JP"], ["sent"], 20, 30, 10]
+
+
+def test_sql_does_not_depend_on_in_list_length(db):
+    short = db.select().from_("people").where("id").in_(["a"])._build()
+    long = db.select().from_("people").where("id").in_([str(i) for i in range(500)])._build()
+    assert short.sql == long.sql
+    assert len(long.params[0]) == 500
+
+
+def test_in_rejects_none(db):
+    with pytest.raises(ValueError):
+        db.select().from_("people").where("id").in_(["a", None])._build()
+
+
+def test_cached_sql_matches_freshly_built_sql(db):
+    def build(value):
+        return db.update("people").set({"status": value}).where("id").equals(value)._build()
+
+    sql_cache.clear()
+    fresh = build("a")
+    cached = build("b")
+    assert sql_cache.hits >= 1
+    assert cached.sql == fresh.sql
+    assert cached.params == ["b", "b"]
+
+
+def test_keyset_parenthesizes_conditions_before_the_cursor(db):
+    query = (db.select().from_("people")
+             .where("a").equals(1).or_where("b").equals(2)
+             .keyset("id", "cursor", 50)
+             ._build())
+    assert query.sql == "SELECT * FROM people WHERE (a = $1 OR b = $2) AND id > $3 ORDER BY id ASC LIMIT $4"
+    assert query.params == [1, 2, "cursor", 50]
+
+    first_page = db.select().from_("people").keyset("id", None, 50)._build()
+    assert first_page.sql == "SELECT * FROM people ORDER BY id ASC LIMIT $1"
+
+
+def test_keyset_refuses_other_orderings(db):
+    with pytest.raises(ValueError):
+        db.select().from_("people").order_by("name").keyset("id", "cursor", 10)._build()
+    with pytest.raises(ValueError):
+        db.select().from_("people").keyset("id", "cursor", 10).order_by("name")._build()
+    # An ordering on the key itself is replaced
+    query = db.select().from_("people").order_by("id").desc().keyset("id", "cursor", 10)._build()
+    assert query.sql.endswith("ORDER BY id ASC LIMIT $2")
+
+
+def test_bulk_insert_is_chunked_under_the_parameter_limit(db):
+    rows = [{"a": i, "b": i, "c": i} for i in range(MAX_QUERY_PARAMS // 3 * 2 + 5)]
+    chunks = db.insert.into("t").values(rows)._build()
+    assert len(chunks) == 3
+    assert all(len(chunk.params) <= MAX_QUERY_PARAMS for chunk in chunks)
+    assert [param for chunk in chunks for param in chunk.params[::3]] == list(range(len(rows)))
+    # Placeholders restart at $1 in every statement
+    assert all("($1, $2, $3)" in chunk.sql for chunk in chunks)
+
+    single = db.insert.into("t").values(rows[:10])._build()
+    assert not isinstance(single, list)
+    assert len(single.params) == 30
+
+
+def test_on_conflict_do_update(db):
+    query = (db.insert.into("holidays")
+             .values([{"country": "IN", "date": "2025-01-26", "name": "Republic Day", "holiday_type": "Public"}])
+             .on_conflict("country", "date", "name").do_update(only_if_changed=True, timestamp_column="updated_at")
+             ._build())
+    assert squash(query.sql) == (
+        "INSERT INTO holidays (country, date, name, holiday_type) VALUES ($1, $2, $3, $4) "
+        "ON CONFLICT (country, date, name) DO UPDATE SET holiday_type = EXCLUDED.holiday_type, updated_at = now() "
+        "WHERE (holidays.holiday_type) IS DISTINCT FROM (EXCLUDED.holiday_type) RETURNING *"
+    )
+
+
+def test_on_conflict_explicit_columns_and_do_nothing(db):
+    upsert = (db.insert.into("people").values({"id": 1, "name": "Ada", "email": "a@x"})
+              .on_conflict("id").do_update(["email"])._build())
+    assert squash(upsert.sql).endswith("ON CONFLICT (id) DO UPDATE SET email = EXCLUDED.email RETURNING *")
+
+    ignore = db.insert.into("people").values({"id": 1, "name": "Ada"}).on_conflict("id").do_nothing()._build()
+    assert squash(ignore.sql).endswith("ON CONFLICT (id) DO NOTHING RETURNING *")
+
+    with pytest.raises(ValueError):
+        db.insert.into("people").values({"id": 1}).on_conflict("id").do_update()._build()
@@ -0,0 +1,57 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from src.holidays import Holidays
+from src.scheduler import Scheduler
+
+
+class CountingGeolocator:
+    """Stands in for Nominatim: answers slowly and counts its lookups."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def geocode(self, location_string):
+        with self._lock:
+            self.calls.append(location_string)
+        time.sleep(0.05)
+        return SimpleNamespace(latitude=12.97, longitude=77.59)
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    scheduler = Scheduler(holidays_client=Holidays(cache_ttl=0),
+                          geocode_cache_path=str(tmp_path / "geocode.sqlite3"))
+    scheduler._geolocator = CountingGeolocator()
+    scheduler._timezone_finder = SimpleNamespace(timezone_at=lambda lat, lng: "Asia/Kolkata")
+    return scheduler
+
+
+def test_concurrent_misses_geocode_a_location_once(scheduler):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(scheduler.locate, ["Springfield, US"] * 4 + [" springfield,  us "] * 4))
+
+    assert scheduler.geolocator.calls == ["Springfield, US"]
+    assert all(result == results[0] for result in results)
+    assert results[0]["timezone"] == "Asia/Kolkata"
+
+
+def test_batch_echoes_each_persons_own_location(scheduler, monkeypatch):
+    monkeypatch.setattr(Holidays, "get_holiday_records", lambda self, year, countries="all", **kwargs: [])
+    locations = [("Bangalore", None, "India"), ("bangalore ", None, "India"), ("BANGALORE", "Karnataka", "India")]
+
+    outcomes = scheduler.get_email_schedules(locations)
+    streamed = {index: outcome for indexes, group in scheduler.iter_email_schedules(locations)
+                for index, outcome in zip(indexes, group)}
+
+    for results in (outcomes, [streamed[index] for index in range(len(locations))]):
+        assert [(r["location"]["city"], r["location"]["state"], r["location"]["country"]) for r in results] == locations
+        assert {r["location"]["timezone"] for r in results} == {"Asia/Kolkata"}
+        # The first two share one computation: same dates and the same holidays list
+        assert results[0]["scheduled_dates"] == results[1]["scheduled_dates"]
+        assert results[0]["holidays"] is results[1]["holidays"]
@@ -0,0 +1,340 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.codec import get_codec
+from src.database.storage import WRITE_CHUNK_RECORDS, JSONStorage
+from src.models import CompanyCreate, CompanyUpdate, PersonCreate, EmailStatCreate
+
+
+def seed_person(i: int, company_id: str, **fields) -> dict:
+    return {
+        "id": f"person-{i:03d}", "companyId": company_id, "name": f"Person {i}",
+        "email": f"person{i}@example.com", "openCount": 0, "clickCount": 0,
+        "resumeOpenCount": 0, "opened": False, "clicked": False, "responded": False,
+        **fields,
+    }
+
+
+def seed_stat(i: int, person_id: str, company_id: str, sent_date: str) -> dict:
+    return {
+        "id": f"stat-{i:03d}", "personId": person_id, "companyId": company_id, "attemptNumber": 1,
+        "sentDate": sent_date, "subject": "Hello", "openCount": 0, "clickCount": 0,
+        "resumeOpenCount": 0, "responded": False,
+    }
+
+
+def journal_lines(storage: JSONStorage) -> list:
+    return storage.journal_file.read_bytes().splitlines()
+
+
+def test_journal_replays_into_a_fresh_instance(make_storage):
+    async def scenario():
+        storage = make_storage()
+        company = await storage.create_company(CompanyCreate(name="Acme", website="acme.com"))
+        person = await storage.create_person(PersonCreate(companyId=company.id, name="Ada", email="ada@acme.com"))
+        await storage.update_person(person.id, PersonCreate(companyId=company.id, name="Ada L", email="ada@acme.com"))
+        removed = await storage.create_person(PersonCreate(companyId=company.id, name="Bob", email="bob@acme.com"))
+        await storage.delete_person(removed.id)
+        return company, person
+
+    company, person = asyncio.run(scenario())
+
+    # Nothing was compacted: the snapshots are still empty and only the journal has the data
+    storage = make_storage()
+    assert storage._read_json(storage.people_file) == []
+    assert len(journal_lines(storage)) == 5
+
+    async def read_back():
+        return await storage.get_company(company.id), await storage.get_people()
+
+    replayed_company, people = asyncio.run(read_back())
+    assert replayed_company.name == "Acme"
+    assert replayed_company.website == "https://acme.com"
+    assert [(p.id, p.name) for p in people] == [(person.id, "Ada L")]
+    assert replayed_company.total_people == 1
+
+
+def test_torn_journal_tail_is_dropped_and_truncated(make_storage):
+    async def create():
+        storage = make_storage()
+        return await storage.create_company(CompanyCreate(name="Acme", website="https://acme.com"))
+
+    company = asyncio.run(create())
+    storage = make_storage()
+    intact_size = storage.journal_file.stat().st_size
+    with open(storage.journal_file, "ab") as f:
+        f.write(b'{"table": "companies", "op": "put", "record": {"id": "torn"')
+
+    async def recover_and_write():
+        companies = await storage.get_companies()
+        size_after_replay = storage.journal_file.stat().st_size
+        await storage.create_company(CompanyCreate(name="Globex", website="https://globex.com"))
+        return companies, size_after_replay
+
+    companies, size_after_replay = asyncio.run(recover_and_write())
+    assert [c.id for c in companies] == [company.id]
+    assert size_after_replay == intact_size
+
+    # The append after recovery starts on its own line, so both entries replay
+    assert len(journal_lines(storage)) == 2
+    names = sorted(c.name for c in asyncio.run(make_storage().get_companies()))
+    assert names == ["Acme", "Globex"]
+
+
+def test_unparseable_journal_line_stops_replay(make_storage):
+    storage = make_storage()
+    storage.journal_file.write_bytes(
+        b'{"table": "companies", "op": "put", "record": {"id": "c1", "name": "A", "website": "https://a"}}\n'
+        b'not json\n'
+        b'{"table": "companies", "op": "put", "record": {"id": "c2", "name": "B", "website": "https://b"}}\n'
+    )
+    companies = asyncio.run(storage.get_companies())
+    assert [c.id for c in companies] == ["c1"]
+
+
+def test_compaction_folds_journal_into_snapshots(make_storage):
+    async def scenario():
+        storage = make_storage(compact_threshold=3)
+        company = await storage.create_company(CompanyCreate(name="Acme", website="https://acme.com"))
+        for name in ("Ada", "Bob"):
+            await storage.create_person(PersonCreate(companyId=company.id, name=name, email=f"{name}@acme.com"))
+        return storage
+
+    storage = asyncio.run(scenario())
+    assert storage.journal_file.read_bytes() == b""
+    assert sorted(p["name"] for p in storage._read_json(storage.people_file)) == ["Ada", "Bob"]
+    assert len(storage._read_json(storage.companies_file)) == 1
+
+
+def test_concurrent_writes_are_all_kept(make_storage):
+    async def scenario():
+        storage = make_storage(compact_threshold=7)
+        company = await storage.create_company(CompanyCreate(name="Acme", website="https://acme.com"))
+        await asyncio.gather(*(
+            storage.create_person(PersonCreate(companyId=company.id, name=f"P{i}", email=f"p{i}@acme.com"))
+            for i in range(40)
+        ))
+        return company
+
+    company = asyncio.run(scenario())
+    reloaded = asyncio.run(make_storage().get_company(company.id))
+    assert reloaded.total_people == 40
+
+
+def test_maintained_counters_match_a_full_recount(make_storage):
+    storage = make_storage()
+    storage._write_json(storage.companies_file, [
+        {"id": "c1", "name": "One", "website": "https://one"},
+        {"id": "c2", "name": "Two", "website": "https://two"},
+    ])
+    storage._write_json(storage.people_file, [
+        seed_person(1, "c1", opened=True, openCount=3, clickCount=1, clicked=True),
+        seed_person(2, "c1", responded=True, resumeOpenCount=2),
+        seed_person(3, "c2", opened=True, openCount=5),
+        seed_person(4, "orphan", openCount=7),
+    ])
+    storage._write_json(storage.email_stats_file, [
+        seed_stat(1, "person-001", "c1", "2025-01-03"),
+        seed_stat(2, "person-003", "c2", "2025-02-03"),
+    ])
+
+    async def scenario():
+        await storage.reload()
+        assert await storage.get_stats_summary() == {
+            "totalEmails": 2, "totalOpens": 8, "totalClicks": 1, "totalResponses": 1,
+        }
+        # Move the responding person to c2, add an email, then drop a company
+        await storage.update_person("person-002", PersonCreate(companyId="c2", name="Person 2", email="p2@x"))
+        await storage.create_email_stat(EmailStatCreate(
+            personId="person-001", companyId="c1", attemptNumber=2, sentDate="2025-03-01", subject="Again"
+        ))
+        await storage.delete_person("person-001")
+        await storage.delete_company("c1")
+        return await storage.get_company("c2"), await storage.get_stats_summary()
+
+    company, summary = asyncio.run(scenario())
+    assert company.total_people == 2
+    assert company.has_responded
+    assert company.resume_open_count == 2
+    assert company.open_count == 5
+    assert summary == {"totalEmails": 1, "totalOpens": 5, "totalClicks": 0, "totalResponses": 1}
+
+    maintained = (storage._company_counters, dict(storage._summary_totals))
+    storage._rebuild_company_stats()
+    recounted = (storage._company_counters, dict(storage._summary_totals))
+    # Counters of companies that dropped to zero may linger; compare the non-empty ones
+    non_empty = lambda counters: {key: value for key, value in counters.items() if any(value.values())}
+    assert non_empty(maintained[0]) == non_empty(recounted[0])
+    assert maintained[1] == recounted[1]
+
+
+def test_keyset_pages_cover_every_person_once(make_storage):
+    storage = make_storage()
+    storage._write_json(storage.people_file, [seed_person(i, f"c{i % 3}") for i in range(25)])
+
+    async def walk(**filters):
+        await storage.reload()
+        seen, cursor = [], None
+        while True:
+            page, cursor = await storage.get_people_page(7, cursor, **filters)
+            seen.extend(person.id for person in page)
+            if cursor is None:
+                return seen
+
+    assert asyncio.run(walk()) == [f"person-{i:03d}" for i in range(25)]
+    assert asyncio.run(walk(company_id="c1")) == [f"person-{i:03d}" for i in range(1, 25, 3)]
+
+
+def test_process_lock_excludes_other_holders(make_storage):
+    first = make_storage(process_lock=True)
+    second = make_storage(process_lock=True)
+    first._acquire_process_lock()
+
+    acquired = threading.Event()
+
+    def take_second():
+        second._acquire_process_lock()
+        acquired.set()
+        second._release_process_lock()
+
+    thread = threading.Thread(target=take_second)
+    thread.start()
+    assert not acquired.wait(0.2)
+    first._release_process_lock()
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_process_lock_is_shared_between_readers(make_storage):
+    first = make_storage(process_lock=True)
+    second = make_storage(process_lock=True)
+    writer = make_storage(process_lock=True)
+    first._acquire_process_lock(exclusive=False)
+
+    # Another reader gets in at once
+    second._acquire_process_lock(exclusive=False)
+    second._release_process_lock()
+
+    acquired = threading.Event()
+
+    def take_exclusive():
+        writer._acquire_process_lock(exclusive=True)
+        acquired.set()
+        writer._release_process_lock()
+
+    thread = threading.Thread(target=take_exclusive)
+    thread.start()
+    assert not acquired.wait(0.2)
+    first._release_process_lock()
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_process_lock_sees_same_size_write_after_compactions(make_storage):
+    reader = make_storage(process_lock=True)
+    writer = make_storage(process_lock=True)
+
+    async def scenario():
+        company = await writer.create_company(CompanyCreate(name="Acme-1", website="https://acme.com"))
+        assert [c.name for c in await reader.get_companies()] == ["Acme-1"]
+        journal_size = writer.journal_file.stat().st_size
+
+        # Compacting twice can hand the journal its old inode back, and the
+        # update journals a record of exactly the same length as the create
+        await writer.compact()
+        await writer.compact()
+        await writer.update_company(company.id, CompanyUpdate(name="Acme-2"))
+        assert writer.journal_file.stat().st_size == journal_size
+        return [c.name for c in await reader.get_companies()]
+
+    assert asyncio.run(scenario()) == ["Acme-2"]
+
+
+def test_process_lock_reloads_writes_of_other_workers(make_storage):
+    first = make_storage(process_lock=True)
+    second = make_storage(process_lock=True)
+
+    async def scenario():
+        assert await second.get_companies() == []
+        company = await first.create_company(CompanyCreate(name="Acme", website="https://acme.com"))
+        seen = [c.id for c in await second.get_companies()]
+        await first.compact()
+        await first.delete_company(company.id)
+        return company, seen, await second.get_companies()
+
+    company, seen, after_delete = asyncio.run(scenario())
+    assert seen == [company.id]
+    assert after_delete == []
+
+
+def test_single_file_snapshots_migrate_to_shards(make_storage):
+    storage = make_storage()
+    people = [seed_person(i, f"company-{i % 7}") for i in range(60)]
+    stats = [seed_stat(i, f"person-{i:03d}", f"company-{i % 7}", f"2025-{i % 3 + 1:02d}-10") for i in range(30)]
+    stats.append(seed_stat(99, "person-000", "company-0", ""))
+    storage._write_json(storage.people_file, people)
+    storage._write_json(storage.email_stats_file, stats)
+
+    sharded = make_storage(sharded=True, people_buckets=4)
+
+    async def migrate():
+        await sharded.reload()
+        await sharded.compact()
+
+    asyncio.run(migrate())
+    bucket_files = sorted(path.name for path in (storage.data_dir / "people").glob("*.json"))
+    month_files = sorted(path.name for path in (storage.data_dir / "email_stats").glob("*.json"))
+    assert bucket_files and set(bucket_files) <= {f"bucket-{i:02d}.json" for i in range(4)}
+    assert month_files == ["2025-01.json", "2025-02.json", "2025-03.json", "undated.json"]
+
+    # Every record is in exactly one shard, the one _shard_of names
+    for table, records in (("people", people), ("email_stats", stats)):
+        for record in records:
+            path = sharded._snapshot_path(sharded._shard_of(table, record))
+            assert record["id"] in {r["id"] for r in sharded._read_json(path)}
+
+    reread = make_storage(sharded=True, people_buckets=4)
+    asyncio.run(reread.reload())
+    assert reread._people == {p["id"]: p for p in people}
+    assert reread._email_stats == {s["id"]: s for s in stats}
+    assert not reread._dirty
+
+
+def test_sharded_compaction_rewrites_only_changed_shards(make_storage):
+    storage = make_storage(sharded=True, people_buckets=8)
+    written = []
+    write_snapshots = storage._write_snapshots
+    storage._write_snapshots = lambda snapshots: (written.append(set(snapshots)), write_snapshots(snapshots))[1]
+
+    async def scenario():
+        company = await storage.create_company(CompanyCreate(name="Acme", website="https://acme.com"))
+        person = await storage.create_person(PersonCreate(companyId=company.id, name="Ada", email="ada@acme.com"))
+        await storage.compact()
+        await storage.compact()
+        await storage.update_person(person.id, PersonCreate(companyId="other", name="Ada", email="ada@acme.com"))
+        await storage.compact()
+        return company, person
+
+    company, person = asyncio.run(scenario())
+    old_bucket = storage._shard_of("people", {"companyId": company.id})
+    new_bucket = storage._shard_of("people", {"companyId": "other"})
+    assert written[0] == {("companies", None), old_bucket}
+    assert written[1] == set()
+    assert written[2] == {old_bucket, new_bucket}
+
+    reread = make_storage(sharded=True, people_buckets=8)
+    asyncio.run(reread.reload())
+    assert reread._people[person.id]["companyId"] == "other"
+
+
+@pytest.mark.parametrize("codec_name", ["json", "orjson"])
+def test_chunked_table_writes_match_a_single_dump(make_storage, codec_name):
+    if codec_name == "orjson":
+        pytest.importorskip("orjson")
+    codec = get_codec(codec_name)
+    records = [seed_person(i, f"c{i % 5}", note="ünïcode") for i in range(WRITE_CHUNK_RECORDS * 2 + 3)]
+    storage = make_storage(json_codec=codec)
+    storage._write_json(storage.people_file, records)
+    assert storage.people_file.read_bytes() == codec.dumps(records, pretty=True)